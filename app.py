@@ -1,20 +1,199 @@
-from flask import Flask, render_template, request
-import requests
 import os
+
+# Async mode: gevent makes sockets, sleeps and threads cooperative, so a request
+# waiting on the football API costs a tiny greenlet instead of a whole worker thread.
+# This has to run before anything else imports socket or threading.
+ASYNC_MODE = os.environ.get("FOOTBALL_ASYNC") == "1"
+if ASYNC_MODE:
+    from gevent import monkey
+    monkey.patch_all()
+
+from flask import Flask, Response, g, jsonify, render_template, request
+import requests
 import time
+import atexit
 import json
-from datetime import datetime, timedelta
+import math
+import functools
+import queue
+import gzip
+import hashlib
+import tempfile
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+try:
+    import brotli
+except ImportError:
+    brotli = None  # Brotli is optional, gzip always works
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # Falls back to the standard json module
+
+try:
+    from flask_sock import Sock
+except ImportError:
+    Sock = None  # No /ws/live endpoint without flask-sock
 
 app = Flask(__name__)
+sock = Sock(app) if Sock else None
 
-# API URLs
-API_BASE = "https://api.football-data.org/v4"
-API_URL = f"{API_BASE}/competitions"
-MATCHES_URL = f"{API_BASE}/matches"
+# API settings
+API_BASE = os.environ.get("FOOTBALL_API_BASE", "https://api.football-data.org/v4")
 API_KEY = os.environ.get("FOOTBALL_API_KEY")  # Set this on each server
+API_POOL_SIZE = int(os.environ.get("FOOTBALL_API_POOL_SIZE", 50 if ASYNC_MODE else 10))  # Open connections kept per host
+API_TIMEOUTS = {"competitions": 10, "matches": 10}  # Seconds to wait per endpoint
+
+def parse_utc_date(utc_date_str):
+    """Parse an API date like 2025-01-23T15:00:00Z (None if it can't be read)"""
+    try:
+        return datetime.fromisoformat(utc_date_str.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        return None
+
+def format_match_time(utc_date_str):
+    """Format match time for display"""
+    try:
+        utc_time = datetime.fromisoformat(utc_date_str.replace('Z', '+00:00'))
+        return utc_time.strftime('%H:%M')
+    except:
+        return "TBD"
+
+def format_upcoming_date(utc_date_str):
+    """Format upcoming match date (simple version for beginners)"""
+    try:
+        utc_time = datetime.fromisoformat(utc_date_str.replace('Z', '+00:00'))
+        return utc_time.strftime('%B %d, %Y')  # Example: January 23, 2025
+    except:
+        return "Date TBD"
+
+# Friendly status display
+STATUS_DISPLAY = {
+    'SCHEDULED': ' Scheduled',
+    'IN_PLAY': ' LIVE',
+    'PAUSED': ' Half Time', 
+    'FINISHED': ' Finished',
+    'POSTPONED': ' Postponed',
+    'CANCELLED': ' Cancelled'
+}
+
+def get_match_status_display(status):
+    """Get friendly status display"""
+    return STATUS_DISPLAY.get(status, status)
+
+# Compact records for API data: decoded once when the data arrives, keeping only
+# the fields the pages use (instead of walking the full upstream JSON on every request)
+@dataclass(slots=True)
+class Area:
+    name: str = ""
+
+@dataclass(slots=True)
+class Competition:
+    name: str = ""
+    code: str = ""
+    area: Area = None
+    plan: str = ""
+    
+    @classmethod
+    def from_api(cls, data):
+        return cls(name=data.get("name") or "", code=data.get("code") or "",
+                   area=Area((data.get("area") or {}).get("name") or ""), plan=data.get("plan") or "")
+    
+    def to_api(self):
+        return {"name": self.name, "code": self.code, "area": {"name": self.area.name}, "plan": self.plan}
+
+@dataclass(slots=True)
+class Team:
+    name: str = "Unknown"
+
+@dataclass(slots=True)
+class Match:
+    id: int = None
+    utc_date: str = ""
+    status: str = "UNKNOWN"
+    competition: Competition = None
+    home_team: Team = None
+    away_team: Team = None
+    home_score: int = None
+    away_score: int = None
+    # Display data for the live and upcoming lists, built once here instead of on every request
+    live_view: dict = field(default=None, repr=False, compare=False)
+    upcoming_view: dict = field(default=None, repr=False, compare=False)
+    kickoff: float = field(default=None, repr=False, compare=False)  # Unix time, for the time-ordered store
+    zone_views: dict = field(default_factory=dict, repr=False, compare=False)  # Timezone name -> views
+    
+    def __post_init__(self):
+        kickoff_time = parse_utc_date(self.utc_date)
+        self.kickoff = kickoff_time.timestamp() if kickoff_time else float("inf")
+        self.live_view = {
+            'homeTeam': self.home_team.name,
+            'awayTeam': self.away_team.name,
+            'homeScore': self.home_score,
+            'awayScore': self.away_score,
+            'status': get_match_status_display(self.status),
+            'competition': self.competition.name or 'Unknown',
+            'time': format_match_time(self.utc_date),
+            'is_live': self.status == 'IN_PLAY'
+        }
+        self.upcoming_view = {
+            'homeTeam': self.home_team.name,
+            'awayTeam': self.away_team.name,
+            'competition': self.competition.name or 'Unknown',
+            'date': format_upcoming_date(self.utc_date),
+            'time': self.live_view['time']
+        }
+    
+    def views_for(self, zone):
+        """(live_view, upcoming_view) with the kickoff shown in zone, worked out once per zone"""
+        views = self.zone_views.get(zone.key)
+        if views is None:
+            local = datetime.fromtimestamp(self.kickoff, zone) if self.kickoff != float("inf") else None
+            time_text = local.strftime('%H:%M') if local else "TBD"
+            date_text = local.strftime('%B %d, %Y') if local else "Date TBD"
+            views = (dict(self.live_view, time=time_text), dict(self.upcoming_view, date=date_text, time=time_text))
+            self.zone_views[zone.key] = views
+        return views
+    
+    @classmethod
+    def from_api(cls, data):
+        full_time = (data.get("score") or {}).get("fullTime") or {}
+        return cls(id=data.get("id"), utc_date=data.get("utcDate") or "", status=data.get("status") or "UNKNOWN",
+                   competition=Competition.from_api(data.get("competition") or {}),
+                   home_team=Team((data.get("homeTeam") or {}).get("name") or "Unknown"),
+                   away_team=Team((data.get("awayTeam") or {}).get("name") or "Unknown"),
+                   home_score=full_time.get("home"), away_score=full_time.get("away"))
+    
+    def to_api(self):
+        return {"id": self.id, "utcDate": self.utc_date, "status": self.status,
+                "competition": {"name": self.competition.name, "code": self.competition.code},
+                "homeTeam": {"name": self.home_team.name}, "awayTeam": {"name": self.away_team.name},
+                "score": {"fullTime": {"home": self.home_score, "away": self.away_score}}}
+
+# Which record each endpoint's list holds
+API_MODELS = {"competitions": Competition, "matches": Match}
+
+def decode_items(endpoint, items):
+    """Turn upstream JSON items into records"""
+    model = API_MODELS[endpoint]
+    return [model.from_api(item) for item in items]
+
+def encode_entry(key, entry):
+    """Cache entry as plain JSON data (for the snapshot file and Redis)"""
+    return dict(entry, data=[item.to_api() for item in entry["data"]])
+
+def decode_entry(key, entry):
+    """Cache entry read back from JSON, with records again"""
+    return dict(entry, data=decode_items(key.split("?")[0], entry["data"]))
 
 # Fallback data for when API is rate limited
-FALLBACK_COMPETITIONS = [
+FALLBACK_COMPETITIONS = [Competition.from_api(comp) for comp in [
     {"name": "Premier League", "code": "PL", "area": {"name": "England"}, "plan": "TIER_ONE"},
     {"name": "La Liga", "code": "PD", "area": {"name": "Spain"}, "plan": "TIER_ONE"},
     {"name": "Bundesliga", "code": "BL1", "area": {"name": "Germany"}, "plan": "TIER_ONE"},
@@ -28,10 +207,10 @@ FALLBACK_COMPETITIONS = [
     {"name": "Campeonato Brasileiro Série A", "code": "BSA", "area": {"name": "Brazil"}, "plan": "TIER_ONE"},
     {"name": "Copa Libertadores", "code": "CLI", "area": {"name": "South America"}, "plan": "TIER_ONE"},
     {"name": "European Championship", "code": "EC", "area": {"name": "Europe"}, "plan": "TIER_ONE"}
-]
+]]
 
 # Sample live matches (fallback data)
-FALLBACK_MATCHES = [
+FALLBACK_MATCHES = [Match.from_api(match) for match in [
     {
         "homeTeam": {"name": "Manchester United", "crest": "🔴"}, 
         "awayTeam": {"name": "Liverpool", "crest": "🔴"},
@@ -56,30 +235,566 @@ FALLBACK_MATCHES = [
         "competition": {"name": "Bundesliga"},
         "score": {"fullTime": {"home": 3, "away": 2}}
     }
-]
+]]
+
+# Sample upcoming matches (fallback data)
+FALLBACK_UPCOMING_MATCHES = [Match.from_api(match) for match in [
+    {
+        "homeTeam": {"name": "Chelsea"}, 
+        "awayTeam": {"name": "Arsenal"},
+        "utcDate": (datetime.now() + timedelta(days=1)).isoformat(),
+        "status": "SCHEDULED",
+        "competition": {"name": "Premier League"},
+        "score": {"fullTime": {"home": None, "away": None}}
+    },
+    {
+        "homeTeam": {"name": "AC Milan"}, 
+        "awayTeam": {"name": "Inter Milan"},
+        "utcDate": (datetime.now() + timedelta(days=2)).isoformat(),
+        "status": "SCHEDULED",
+        "competition": {"name": "Serie A"},
+        "score": {"fullTime": {"home": None, "away": None}}
+    },
+    {
+        "homeTeam": {"name": "Paris Saint-Germain"}, 
+        "awayTeam": {"name": "Marseille"},
+        "utcDate": (datetime.now() + timedelta(days=3)).isoformat(),
+        "status": "SCHEDULED",
+        "competition": {"name": "Ligue 1"},
+        "score": {"fullTime": {"home": None, "away": None}}
+    }
+]]
+
+class MemoryCacheBackend:
+    """Cache backend that keeps entries in this process only"""
+    
+    def __init__(self):
+        self.entries = {}
+    
+    def get(self, key):
+        return self.entries.get(key)
+    
+    def set(self, key, entry):
+        self.entries[key] = entry
+    
+    def items(self):
+        return list(self.entries.items())
+    
+    def keys(self):
+        return list(self.entries)
+    
+    def delete(self, key):
+        self.entries.pop(key, None)
+    
+    def acquire_fetch(self, key):
+        # Only one process uses this cache, so in_flight already does the job
+        return True
+    
+    def release_fetch(self, key):
+        pass
 
-# Cache for API responses
-api_cache = {"data": None, "timestamp": 0}
+class RedisCacheBackend:
+    """Cache backend shared by every worker that points at the same Redis server"""
+    
+    PREFIX = "football:cache:"
+    LOCK_PREFIX = "football:fetching:"
+    KEEP_FOR = 86400  # Keep entries around for a day so stale data can still be served
+    
+    def __init__(self, url):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("FOOTBALL_CACHE_URL is a redis:// URL but the redis package is not installed")
+        self.client = redis.Redis.from_url(url)
+        self.decoded = {}  # Key -> (raw bytes, entry) so unchanged data is not decoded again
+    
+    def get(self, key):
+        raw = self.client.get(self.PREFIX + key)
+        if not raw:
+            return None
+        previous = self.decoded.get(key)
+        if previous and previous[0] == raw:
+            # Same data as last time: return the same objects so per-data lookups can be reused
+            return previous[1]
+        entry = decode_entry(key, json.loads(raw))
+        # New data (possibly stored by another worker), so pages built before it are stale
+        bump_data_version(entry["timestamp"])
+        self.decoded[key] = (raw, entry)
+        return entry
+    
+    def set(self, key, entry):
+        # Old entries (like ones from a days-old snapshot) still need a TTL Redis accepts
+        keep_for = max(int(entry["expires"] - time.time()) + self.KEEP_FOR, 1)
+        raw = json.dumps(encode_entry(key, entry)).encode()
+        self.client.set(self.PREFIX + key, raw, ex=keep_for)
+        # Our own write reads back as the same objects (set_cached already bumped the data version)
+        self.decoded[key] = (raw, entry)
+    
+    def items(self):
+        items = []
+        for key in self.keys():
+            entry = self.get(key)
+            if entry:
+                items.append((key, entry))
+        return items
+    
+    def keys(self):
+        return [full_key.decode()[len(self.PREFIX):] for full_key in self.client.scan_iter(match=self.PREFIX + "*")]
+    
+    def delete(self, key):
+        self.client.delete(self.PREFIX + key)
+        self.decoded.pop(key, None)
+    
+    def acquire_fetch(self, key):
+        # Only the worker that sets the lock key calls the API; it expires on its own if that worker dies
+        return bool(self.client.set(self.LOCK_PREFIX + key, os.getpid(), nx=True, ex=FETCH_LOCK_TIMEOUT))
+    
+    def release_fetch(self, key):
+        self.client.delete(self.LOCK_PREFIX + key)
+
+def create_cache_backend():
+    """Pick the cache backend from FOOTBALL_CACHE_URL (in-process if not set)"""
+    cache_url = os.environ.get("FOOTBALL_CACHE_URL", "")
+    if cache_url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisCacheBackend(cache_url)
+    return MemoryCacheBackend()
+
+# Cache for API responses, keyed by endpoint and params
+# (set FOOTBALL_CACHE_URL=redis://... so all gunicorn workers share one cache)
+FETCH_LOCK_TIMEOUT = 15  # Seconds other workers wait for the one doing the upstream call
+api_cache = create_cache_backend()
+
+# Goes up by one every time new API data lands in the cache (pages built on older data are stale)
+# ("timestamp" is when the newest data came from the API, used for Last-Modified)
+data_version = {"number": 0, "timestamp": time.time()}
+version_lock = threading.Lock()
+
+def bump_data_version(timestamp=None):
+    """Mark that the API data changed, so cached pages built on it are no longer used"""
+    with version_lock:
+        data_version["number"] += 1
+        data_version["timestamp"] = max(data_version["timestamp"], timestamp or time.time())
+
+# Last good API data is saved here (one file per cache key) so a restarted app can serve
+# real data right away. Changes are collected for a few seconds and written on a timer thread.
+SNAPSHOT_DIR = os.environ.get("FOOTBALL_SNAPSHOT_DIR",
+                              os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache_snapshot"))
+SNAPSHOT_DELAY = 5  # Seconds to collect cache changes before writing them
+snapshot_lock = threading.Lock()  # Guards snapshot_state
+snapshot_state = {"pending": {}, "timer": None}  # Cache key -> entry to write (None = remove its file)
+cache_stats = {"hits": 0, "misses": 0, "stale": 0}
+cache_lock = threading.Lock()  # Guards cache_stats and in_flight (never held while talking to api_cache)
+in_flight = {}  # Cache key -> Future for the one upstream call running for that key
 CACHE_DURATION = 300  # 5 minutes
+LIVE_CACHE_DURATION = 30  # Keep it short while a match is being played
+LIVE_STATUSES = ("IN_PLAY", "PAUSED")
+COMPETITIONS_MAX_STALENESS = 3600  # Serve old competitions while refreshing, up to 1 hour past expiry
 
-def get_competitions_data():
-    """Get competitions data from API or fallback"""
-    global api_cache
-    current_time = time.time()
+# Shared thread pool so the home page can fetch all upstream data at the same time
+upstream_pool = ThreadPoolExecutor(max_workers=64 if ASYNC_MODE else 8, thread_name_prefix="upstream")
+PAGE_DEADLINE = 10  # Max seconds a page waits for all upstream data together
+
+# Background worker that refreshes expired cache entries while requests get the stale copy
+refresh_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="refresh")
+
+# Live score stream: the poller pushes changed matches to every connected /events/live
+# and /ws/live client
+live_subscribers = {}  # One queue per connected client -> competition codes it wants (None = all)
+live_lock = threading.Lock()  # Guards live_subscribers and live_state
+live_state = {}  # Match key -> last (status, home score, away score) we sent
+SSE_QUEUE_SIZE = 100  # Clients that fall this far behind are disconnected
+SSE_KEEPALIVE = 15  # Seconds between keep-alive comments so proxies keep the stream open
+ASYNC_WORKER_CONNECTIONS = 10000  # Clients one gevent worker holds at once (gunicorn's default is 1000)
+
+# Competition name -> code, for sample matches that only carry the competition name
+COMPETITION_CODES = {comp.name: comp.code for comp in FALLBACK_COMPETITIONS}
+
+# Rendered pages, most recently used last, so repeat visits skip fetching and rendering
+page_cache = OrderedDict()
+page_cache_lock = threading.Lock()
+PAGE_CACHE_MAX_BYTES = 20 * 1024 * 1024  # Memory budget for all cached pages
+PAGE_CACHE_DURATION = 30  # Pages using API data are rebuilt at least this often
+PAGE_CACHE_ARGS = ("search", "sort", "country")  # The only query args that change a page
+APP_STARTED = time.time()  # Last-Modified for pages that don't use API data
+LIVE_PAGE_MAX_AGE = 15  # Browser/CDN Cache-Control for pages with live scores
+STATIC_PAGE_MAX_AGE = 86400  # Team and competition pages rarely change
+COMPRESS_MIN_SIZE = 500  # Smaller pages are sent as they are
+page_cache_state = {"bytes": 0, "hits": 0, "misses": 0}
+
+# Search/filter/sort index for the competitions list, rebuilt when the list changes
+competition_index = {"source": None, "index": None}
+index_lock = threading.Lock()  # Guards competition_index and match_store
+
+# One rolling window of matches serves today's, upcoming and recent views
+# (football-data.org allows at most 10 days per /matches call)
+MATCH_WINDOW_DAYS_BEFORE = 2
+MATCH_WINDOW_DAYS_AFTER = 7
+match_store = {"source": None, "store": None}  # Matches sorted by kickoff, rebuilt when the list changes
+match_window = {"key": None}  # Cache key of the window in use; windows from earlier days are dropped
+
+# Optional background poller that keeps the match data fresh while games are on.
+# It polls only around kickoffs (see build_poll_schedule) and sleeps in between.
+POLL_LIVE_INTERVAL = 20  # Seconds between polls while a match is on
+POLL_IDLE_INTERVAL = 1800  # Longest sleep when no match is about to start (picks up rescheduled kickoffs)
+POLL_CACHE_MARGIN = 120  # Polled data stays fresh this much past the poller's longest sleep (rate-limit waits, slow calls)
+KICKOFF_LEAD = 300  # Start polling a match this many seconds before kickoff
+MATCH_MAX_DURATION = 3 * 3600  # Stop polling a match this long after kickoff even if it never says FINISHED
+ENDED_STATUSES = ("FINISHED", "AWARDED", "POSTPONED", "CANCELLED", "SUSPENDED")  # Nothing left to poll for
+poller_state = {"thread": None, "stop": threading.Event(), "last_poll": None, "next_delay": None,
+                "schedule": None, "role": "leader"}  # role: "leader" calls the API, a "follower" only reads the cache
+
+def create_api_session():
+    """Create the shared HTTP session that keeps connections to the API open"""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=API_POOL_SIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if API_KEY:
+        session.headers["X-Auth-Token"] = API_KEY
+    return session
+
+# Circuit breaker: after several failures in a row, skip the API for a cool-down
+# (pages use cached or sample data right away), then let one probe call through
+CIRCUIT_FAILURE_THRESHOLD = 3  # Failures (errors, timeouts, 5xx, 429) in a row before opening
+CIRCUIT_COOLDOWN = 30  # Seconds to skip the API after opening
+CIRCUIT_MAX_COOLDOWN = 600  # The cool-down doubles after each failed probe, up to this
+circuit = {"failures": 0, "opened_at": None, "probing": False, "cooldown": CIRCUIT_COOLDOWN}
+circuit_lock = threading.Lock()
+
+# Client-side rate limit: a token bucket kept in sync with the API's quota headers.
+# Lower priority fetches leave some calls in the bucket for higher priority ones.
+RATE_LIMIT_PER_MINUTE = int(os.environ.get("FOOTBALL_API_RATE_LIMIT", 10))  # Free tier allows 10 calls a minute
+PRIORITY_RESERVE = {"live": 0, "competitions": 1}  # Calls that must stay left over
+rate_budget = {"tokens": float(RATE_LIMIT_PER_MINUTE), "updated": time.time(), "reset_at": None, "denied": {}}
+rate_lock = threading.Lock()
+
+# One session for the whole process so every fetch reuses pooled keep-alive connections
+api_session = create_api_session()
+
+class CircuitOpenError(Exception):
+    """The API is failing, so calls are skipped until the cool-down is over"""
+
+def circuit_allows_call():
+    """Check the circuit breaker before calling the API (only one probe when the cool-down ends)"""
+    with circuit_lock:
+        if circuit["opened_at"] is None:
+            return True
+        if time.time() < circuit["opened_at"] + circuit["cooldown"] or circuit["probing"]:
+            return False
+        circuit["probing"] = True
+        return True
+
+def record_api_result(ok, retry_after=None):
+    """Update the circuit breaker after an API call"""
+    with circuit_lock:
+        if ok:
+            circuit.update(failures=0, opened_at=None, probing=False, cooldown=CIRCUIT_COOLDOWN)
+            return
+        
+        circuit["failures"] += 1
+        if circuit["probing"]:
+            # The probe failed too: stay open and wait longer next time
+            circuit["cooldown"] = min(circuit["cooldown"] * 2, CIRCUIT_MAX_COOLDOWN)
+        if circuit["probing"] or circuit["failures"] >= CIRCUIT_FAILURE_THRESHOLD:
+            circuit["opened_at"] = time.time()
+            circuit["probing"] = False
+            if retry_after:
+                circuit["cooldown"] = min(max(circuit["cooldown"], retry_after), CIRCUIT_MAX_COOLDOWN)
+
+class RateLimitedError(Exception):
+    """No API calls left in this minute for a fetch of this priority"""
+
+def refill_rate_budget(now):
+    """Top up the token bucket (call with rate_lock held)"""
+    if rate_budget["reset_at"] is not None:
+        # The API told us exactly what is left until its counter resets
+        if now < rate_budget["reset_at"]:
+            return
+        rate_budget.update(tokens=float(RATE_LIMIT_PER_MINUTE), reset_at=None)
+    else:
+        refill = (now - rate_budget["updated"]) * RATE_LIMIT_PER_MINUTE / 60
+        rate_budget["tokens"] = min(float(RATE_LIMIT_PER_MINUTE), rate_budget["tokens"] + refill)
+    rate_budget["updated"] = now
+
+def take_api_token(priority):
+    """Use one API call from the budget, keeping some calls back for higher priority fetches"""
+    with rate_lock:
+        refill_rate_budget(time.time())
+        if rate_budget["tokens"] - 1 < PRIORITY_RESERVE[priority]:
+            rate_budget["denied"][priority] = rate_budget["denied"].get(priority, 0) + 1
+            return False
+        rate_budget["tokens"] -= 1
+        return True
+
+def seconds_until_api_token(priority):
+    """How long until a fetch of this priority could get a token (0 if it can now)"""
+    with rate_lock:
+        now = time.time()
+        refill_rate_budget(now)
+        missing = PRIORITY_RESERVE[priority] + 1 - rate_budget["tokens"]
+        if missing <= 0:
+            return 0
+        if rate_budget["reset_at"] is not None:
+            return rate_budget["reset_at"] - now
+        return missing * 60 / RATE_LIMIT_PER_MINUTE
+
+def update_rate_budget(response):
+    """Sync the token bucket with the quota headers football-data.org sends back"""
+    available = response.headers.get("X-Requests-Available-Minute", "")
+    reset = response.headers.get("X-RequestCounter-Reset", "")
+    with rate_lock:
+        now = time.time()
+        if available.isdigit():
+            rate_budget["tokens"] = float(available)
+            rate_budget["updated"] = now
+        elif response.status_code == 429:
+            rate_budget["tokens"] = 0.0
+        if reset.isdigit() and (available.isdigit() or response.status_code == 429):
+            rate_budget["reset_at"] = now + int(reset)
+
+def api_get(endpoint, params=None, priority="competitions"):
+    """Call an API endpoint (like "matches") through the shared session, rate governor and circuit breaker"""
+    if not circuit_allows_call():
+        raise CircuitOpenError(endpoint)
+    if not take_api_token(priority):
+        # Don't hold the probe slot if the breaker gave us one
+        with circuit_lock:
+            circuit["probing"] = False
+        raise RateLimitedError(endpoint)
+    
+    try:
+        response = api_session.get(f"{API_BASE}/{endpoint}", params=params,
+                                   timeout=API_TIMEOUTS.get(endpoint, 10))
+    except requests.RequestException:
+        record_api_result(False)
+        raise
+    
+    update_rate_budget(response)
+    # Rate limiting (429) and server errors mean the API is in trouble; other answers mean it's up
+    if response.status_code == 429 or response.status_code >= 500:
+        retry_after = response.headers.get("Retry-After", "")
+        record_api_result(False, int(retry_after) if retry_after.isdigit() else None)
+    else:
+        record_api_result(True)
+    return response
+
+def cache_key(endpoint, params=None):
+    """Build a cache key like "matches?dateFrom=...&dateTo=..." """
+    query = "&".join(f"{key}={value}" for key, value in sorted((params or {}).items()))
+    return f"{endpoint}?{query}"
+
+def get_cached(key, max_stale=0):
+    """Get cached data and whether it is still fresh.
+
+    Expired data is still returned (as not fresh) for up to max_stale
+    seconds past its expiry. Returns (None, False) if there is nothing usable.
+    """
+    entry = api_cache.get(key)
+    with cache_lock:
+        now = time.time()
+        if entry and now < entry["expires"]:
+            cache_stats["hits"] += 1
+            return entry["data"], True
+        if entry and now < entry["expires"] + max_stale:
+            cache_stats["stale"] += 1
+            return entry["data"], False
+        cache_stats["misses"] += 1
+        return None, False
+
+def set_cached(key, data, ttl):
+    """Store data in the cache for ttl seconds"""
+    now = time.time()
+    entry = {"data": data, "timestamp": now, "expires": now + ttl}
+    api_cache.set(key, entry)
+    bump_data_version(now)
+    queue_snapshot(key, entry)
+
+def snapshot_path(key):
+    """Snapshot file for a cache key (named by a hash, since keys contain ? and &)"""
+    return os.path.join(SNAPSHOT_DIR, hashlib.sha1(key.encode()).hexdigest() + ".json")
+
+def queue_snapshot(key, entry):
+    """Save an entry (None removes it) in the snapshot SNAPSHOT_DELAY seconds from now"""
+    if not SNAPSHOT_DIR:
+        return
+    with snapshot_lock:
+        snapshot_state["pending"][key] = entry
+        if snapshot_state["timer"] is None:
+            timer = threading.Timer(SNAPSHOT_DELAY, save_snapshot)
+            timer.daemon = True
+            snapshot_state["timer"] = timer
+            timer.start()
+
+def save_snapshot():
+    """Write the entries that changed since the last save (atomic rename, so readers never see half a file)"""
+    with snapshot_lock:
+        pending = snapshot_state["pending"]
+        snapshot_state.update(pending={}, timer=None)
+    if not pending:
+        return 0
+    
+    try:
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        for key, entry in pending.items():
+            path = snapshot_path(key)
+            if entry is None:
+                if os.path.exists(path):
+                    os.remove(path)
+                continue
+            with tempfile.NamedTemporaryFile("w", dir=SNAPSHOT_DIR, suffix=".tmp", delete=False) as temp_file:
+                json.dump({"key": key, "entry": encode_entry(key, entry)}, temp_file)
+            os.replace(temp_file.name, path)
+    except OSError:
+        # A missing snapshot only costs a slower restart, never fail anything for it
+        pass
+    return len(pending)
+
+def load_snapshot():
+    """Fill the cache from SNAPSHOT_DIR at startup (entries keep their old timestamps)"""
+    if not SNAPSHOT_DIR or not os.path.isdir(SNAPSHOT_DIR):
+        return 0
+    
+    loaded = []
+    for name in os.listdir(SNAPSHOT_DIR):
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(SNAPSHOT_DIR, name)) as snapshot:
+                saved = json.load(snapshot)
+            key, entry = saved["key"], decode_entry(saved["key"], saved["entry"])
+        except (OSError, ValueError, KeyError, TypeError):
+            continue
+        if not api_cache.get(key):
+            api_cache.set(key, entry)
+        loaded.append(entry["timestamp"])
+    bump_data_version(max(loaded) if loaded else None)
+    return len(loaded)
+
+def cache_age(key):
+    """Seconds since the cached data for a key came from the API (None if not cached)"""
+    entry = api_cache.get(key)
+    return time.time() - entry["timestamp"] if entry else None
+
+def single_flight(key, fetch, force=False):
+    """Make sure only one upstream call runs per cache key at a time.
+
+    The first caller runs fetch(). Callers that arrive while it is running
+    get the stale cached value if there is one, otherwise they wait for
+    the running call and share its result. With force the first caller
+    fetches even if the cached entry is still fresh.
+    """
+    with cache_lock:
+        future = in_flight.get(key)
+        leader = future is None
+        if leader:
+            future = Future()
+            in_flight[key] = future
     
-    # Use cached data if available and fresh
-    if api_cache["data"] and (current_time - api_cache["timestamp"]) < CACHE_DURATION:
-        return api_cache["data"], False
+    if not leader:
+        stale = api_cache.get(key)
+        if stale:
+            return stale["data"]
+        return future.result()
     
     try:
-        headers = {"X-Auth-Token": API_KEY} if API_KEY else {}
-        response = requests.get(API_URL, headers=headers, timeout=10)
+        # The last leader may have refreshed the entry just before we took over
+        entry = api_cache.get(key) if not force else None
+        if entry and time.time() < entry["expires"]:
+            result = entry["data"]
+        else:
+            result = fetch_once_across_workers(key, fetch)
+        future.set_result(result)
+        return result
+    except Exception as error:
+        future.set_exception(error)
+        raise
+    finally:
+        with cache_lock:
+            in_flight.pop(key, None)
+
+def fetch_once_across_workers(key, fetch):
+    """Run fetch() unless another worker sharing the cache is already doing it"""
+    if api_cache.acquire_fetch(key):
+        try:
+            return fetch()
+        finally:
+            api_cache.release_fetch(key)
+    
+    # Another worker is calling the API; wait for it to store a new entry
+    old_entry = api_cache.get(key)
+    old_timestamp = old_entry["timestamp"] if old_entry else 0
+    started = time.time()
+    while time.time() - started < FETCH_LOCK_TIMEOUT:
+        time.sleep(0.1)
+        entry = api_cache.get(key)
+        if entry and entry["timestamp"] > old_timestamp:
+            return entry["data"]
+    
+    # It took too long (or failed), so call the API ourselves
+    return fetch()
+
+def refresh_in_background(key, fetch):
+    """Start a background refresh for a cache key unless one is already running"""
+    with cache_lock:
+        if key in in_flight:
+            return
+    refresh_pool.submit(single_flight, key, fetch)
+
+def matches_ttl(matches):
+    """Short cache time while any match is live, long when nothing is changing"""
+    if any(match.status in LIVE_STATUSES for match in matches):
+        return LIVE_CACHE_DURATION
+    return CACHE_DURATION
+
+def polled_ttl(matches):
+    """Cache time for match data the poller fetched: fresh until after its next poll, however long it sleeps"""
+    return max(matches_ttl(matches), POLL_IDLE_INTERVAL + POLL_CACHE_MARGIN)
+
+def cached_api_get(endpoint, params=None, ttl=lambda items: CACHE_DURATION, max_stale=0, force=False,
+                   priority="competitions"):
+    """Get the list of items for an endpoint through the cache (None if the API failed).
+
+    With max_stale, expired data is returned right away and refreshed on
+    a background thread; only data older than that blocks on the API.
+    force skips the cache and always asks the API (used by the poller).
+    priority ("live" or "competitions") decides who gets the last API
+    calls of the minute.
+    """
+    key = cache_key(endpoint, params)
+    
+    def fetch():
+        response = api_get(endpoint, params, priority)
+        if response.status_code != 200:
+            return None
         
-        if response.status_code == 200:
-            data = response.json()
-            competitions = data.get("competitions", [])
-            api_cache["data"] = competitions
-            api_cache["timestamp"] = current_time
+        # The API returns the list under the endpoint name ("competitions", "matches")
+        items = decode_items(endpoint, response.json().get(endpoint, []))
+        set_cached(key, items, ttl(items))
+        return items
+    
+    items, fresh = get_cached(key, max_stale) if not force else (None, False)
+    if items is not None:
+        if not fresh:
+            refresh_in_background(key, fetch)
+        return items
+    
+    try:
+        items = single_flight(key, fetch, force=force)
+    except Exception:
+        items = None
+    
+    if items is None:
+        # The API failed, so use the last good data however old it is (from a snapshot too)
+        entry = api_cache.get(key)
+        if entry:
+            return entry["data"]
+    return items
+
+def get_competitions_data(force=False):
+    """Get competitions data from API or fallback"""
+    try:
+        competitions = cached_api_get("competitions", max_stale=COMPETITIONS_MAX_STALENESS, force=force)
+        if competitions is not None:
             return competitions, False
         else:
             # API error, use fallback
@@ -88,178 +803,695 @@ def get_competitions_data():
         # Connection error, use fallback
         return FALLBACK_COMPETITIONS, True
 
-def get_live_matches():
-    """Get today's live matches from API or fallback"""
+def match_window_params():
+    """API params for the match window: a couple of days back to a week ahead"""
+    today = datetime.now().date()
+    return {'dateFrom': (today - timedelta(days=MATCH_WINDOW_DAYS_BEFORE)).isoformat(),
+            'dateTo': (today + timedelta(days=MATCH_WINDOW_DAYS_AFTER)).isoformat()}
+
+def get_match_window(force=False, ttl=matches_ttl):
+    """Get every match in the match window in one API call (None if it failed)"""
+    params = match_window_params()
+    matches = cached_api_get("matches", params, ttl=ttl, force=force, priority="live")
+    key = cache_key("matches", params)
+    if matches is not None and match_window["key"] != key:
+        # First data for a new day: yesterday's window (also restored from the snapshot) is never read again
+        drop_old_match_windows(key)
+        match_window["key"] = key
+    return matches
+
+def drop_old_match_windows(current_key):
+    """Remove every cached match window except current_key, from the cache and the snapshot"""
+    for key in api_cache.keys():
+        if key.startswith("matches?") and key != current_key:
+            api_cache.delete(key)
+            queue_snapshot(key, None)
+
+def cached_match_window():
+    """The match window as it is in the cache right now, however old (None if not cached, never calls the API)"""
+    entry = api_cache.get(cache_key("matches", match_window_params()))
+    return entry["data"] if entry else None
+
+def build_match_store(matches):
+    """Sort matches by kickoff once per data refresh so date views are bisect slices"""
+    ordered = sorted(matches, key=lambda match: match.kickoff)
+    return {"matches": ordered, "kickoffs": [match.kickoff for match in ordered]}
+
+def get_match_store(matches):
+    """Get the time-ordered store for this match list, building it only when the data changed"""
+    with index_lock:
+        if match_store["source"] is not matches:
+            match_store["store"] = build_match_store(matches)
+            match_store["source"] = matches
+        return match_store["store"]
+
+def matches_between(store, start, end):
+    """Matches kicking off from start (included) to end (not included), as Unix times"""
+    kickoffs = store["kickoffs"]
+    return store["matches"][bisect_left(kickoffs, start):bisect_left(kickoffs, end)]
+
+def start_of_day(days_from_today=0, zone=None):
+    """Unix time of midnight in zone (server time if None), days_from_today days from today"""
+    midnight = datetime.now(zone).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (midnight + timedelta(days=days_from_today)).timestamp()
+
+def get_live_matches(force=False, zone=None, limit=10):
+    """Get today's live matches (today in zone) from API or fallback.
+
+    The page lists show the first limit matches; live clients pass
+    limit=None so changes in every match today are sent.
+    """
     try:
         if not API_KEY:
             return FALLBACK_MATCHES, True
-            
-        headers = {"X-Auth-Token": API_KEY}
-        today = datetime.now().strftime('%Y-%m-%d')
-        params = {'dateFrom': today, 'dateTo': today}
         
-        response = requests.get(MATCHES_URL, headers=headers, params=params, timeout=10)
+        matches = get_match_window(force)
         
-        if response.status_code == 200:
-            data = response.json()
-            matches = data.get("matches", [])
-            return matches[:10], False  # Limit to 10 matches
+        if matches is not None:
+            today = matches_between(get_match_store(matches), start_of_day(0, zone), start_of_day(1, zone))
+            return today[:limit], False
         else:
             return FALLBACK_MATCHES, True
     except Exception:
         return FALLBACK_MATCHES, True
 
-def get_upcoming_matches():
-    """Get upcoming matches for next 7 days (simple version for beginners)"""
-    # Simple upcoming matches data (beginner approach)
-    upcoming = [
-        {
-            "homeTeam": {"name": "Chelsea"}, 
-            "awayTeam": {"name": "Arsenal"},
-            "utcDate": (datetime.now() + timedelta(days=1)).isoformat(),
-            "status": "SCHEDULED",
-            "competition": {"name": "Premier League"},
-            "score": {"fullTime": {"home": None, "away": None}}
-        },
-        {
-            "homeTeam": {"name": "AC Milan"}, 
-            "awayTeam": {"name": "Inter Milan"},
-            "utcDate": (datetime.now() + timedelta(days=2)).isoformat(),
-            "status": "SCHEDULED",
-            "competition": {"name": "Serie A"},
-            "score": {"fullTime": {"home": None, "away": None}}
-        },
-        {
-            "homeTeam": {"name": "Paris Saint-Germain"}, 
-            "awayTeam": {"name": "Marseille"},
-            "utcDate": (datetime.now() + timedelta(days=3)).isoformat(),
-            "status": "SCHEDULED",
-            "competition": {"name": "Ligue 1"},
-            "score": {"fullTime": {"home": None, "away": None}}
-        }
-    ]
-    
+def get_upcoming_matches(force=False, zone=None):
+    """Get upcoming matches for next 7 days in zone (simple version for beginners)"""
     try:
         if API_KEY:
-            # Try to get real upcoming matches
-            headers = {"X-Auth-Token": API_KEY}
-            tomorrow = (datetime.now() + timedelta(days=1)).strftime('%Y-%m-%d')
-            week_ahead = (datetime.now() + timedelta(days=7)).strftime('%Y-%m-%d')
-            params = {'dateFrom': tomorrow, 'dateTo': week_ahead}
+            # Try to get real upcoming matches (from the same match window as today's matches)
+            matches = get_match_window(force)
             
-            response = requests.get(MATCHES_URL, headers=headers, params=params, timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                real_matches = data.get("matches", [])
+            if matches:
+                real_matches = matches_between(get_match_store(matches), start_of_day(1, zone), start_of_day(8, zone))
                 if real_matches:
                     return real_matches[:5], False  # Return first 5 real matches
         
         # Fallback to simple data
-        return upcoming, True
+        return FALLBACK_UPCOMING_MATCHES, True
         
     except Exception:
-        return upcoming, True
+        return FALLBACK_UPCOMING_MATCHES, True
 
-def format_match_time(utc_date_str):
-    """Format match time for display"""
+def get_recent_results(days=MATCH_WINDOW_DAYS_BEFORE, zone=None):
+    """Get finished matches from the last few days, newest first (no extra API call)"""
     try:
-        utc_time = datetime.fromisoformat(utc_date_str.replace('Z', '+00:00'))
-        return utc_time.strftime('%H:%M')
-    except:
-        return "TBD"
+        if API_KEY:
+            matches = get_match_window()
+            if matches is not None:
+                recent = matches_between(get_match_store(matches), start_of_day(-days, zone), time.time())
+                return [match for match in reversed(recent) if match.status == 'FINISHED'][:10], False
+        return [match for match in FALLBACK_MATCHES if match.status == 'FINISHED'], True
+    except Exception:
+        return [match for match in FALLBACK_MATCHES if match.status == 'FINISHED'], True
 
-def format_upcoming_date(utc_date_str):
-    """Format upcoming match date (simple version for beginners)"""
+def build_poll_schedule(store, now):
+    """Work out what the poller should watch at Unix time now (pass any time to simulate a day).
+
+    A match is active from KICKOFF_LEAD seconds before kickoff until it
+    has ended (or MATCH_MAX_DURATION after kickoff). While any match is
+    active the poller asks again every POLL_LIVE_INTERVAL, only for the
+    active competitions; otherwise it sleeps until the next kickoff's lead
+    time, at most POLL_IDLE_INTERVAL.
+    """
+    kickoffs = store["kickoffs"]
+    # Kickoffs after now - MATCH_MAX_DURATION, up to and including now + KICKOFF_LEAD
+    first, last = bisect_right(kickoffs, now - MATCH_MAX_DURATION), bisect_right(kickoffs, now + KICKOFF_LEAD)
+    active = [match for match in store["matches"][first:last] if match.status not in ENDED_STATUSES]
+    later = store["matches"][last:]
+    next_match = next((match for match in later
+                       if match.status not in ENDED_STATUSES and match.kickoff != float("inf")), None)
+    
+    if active:
+        delay = POLL_LIVE_INTERVAL
+    elif next_match:
+        delay = min(max(next_match.kickoff - KICKOFF_LEAD - now, 0), POLL_IDLE_INTERVAL)
+    else:
+        delay = POLL_IDLE_INTERVAL
+    
+    codes = {competition_code(match) for match in active}
+    return {
+        "active": [match_key(match) for match in active],
+        # None means poll the whole window (nothing active, or a match without a competition code)
+        "competitions": sorted(codes) if active and None not in codes else None,
+        "dates": (datetime.fromtimestamp(active[0].kickoff, timezone.utc).date().isoformat(),
+                  datetime.fromtimestamp(active[-1].kickoff, timezone.utc).date().isoformat()) if active else None,
+        "next_kickoff": next_match.kickoff if next_match else None,
+        "delay": max(math.ceil(delay), 1),  # Whole seconds, never 0 (that would poll again right away)
+    }
+
+def refresh_active_matches(schedule):
+    """Ask the API only for the competitions in play and merge them into the cached match window.
+
+    Returns the merged match list, or None if the API failed (the cache
+    is left as it was).
+    """
+    key = cache_key("matches", match_window_params())
+    date_from, date_to = schedule["dates"]
+    params = {'competitions': ",".join(schedule["competitions"]), 'dateFrom': date_from,
+              'dateTo': (datetime.fromisoformat(date_to) + timedelta(days=1)).date().isoformat()}
+    
+    def fetch():
+        response = api_get("matches", params, priority="live")
+        if response.status_code != 200:
+            return None
+        fresh = {match_key(match): match
+                 for match in decode_items("matches", response.json().get("matches", []))}
+        entry = api_cache.get(key)
+        if not entry:
+            return None
+        merged = [fresh.pop(match_key(match), match) for match in entry["data"]]
+        merged.extend(fresh.values())
+        set_cached(key, merged, polled_ttl(merged))
+        return merged
+    
     try:
-        utc_time = datetime.fromisoformat(utc_date_str.replace('Z', '+00:00'))
-        return utc_time.strftime('%B %d, %Y')  # Example: January 23, 2025
-    except:
-        return "Date TBD"
+        return single_flight(key, fetch, force=True)
+    except Exception:
+        return None
 
-def get_match_status_display(status):
-    """Get friendly status display"""
-    status_map = {
-        'SCHEDULED': ' Scheduled',
-        'IN_PLAY': ' LIVE',
-        'PAUSED': ' Half Time', 
-        'FINISHED': ' Finished',
-        'POSTPONED': ' Postponed',
-        'CANCELLED': ' Cancelled'
+def poll_upstream(stop_event, clock=time.time):
+    """Keep the match window fresh in the cache while matches are on, until stop_event is set.
+
+    After each poll build_poll_schedule decides when to poll next and for
+    which competitions. With nothing around kickoff the poller sleeps
+    until the next one, so no API calls are spent on a quiet day. The
+    whole window is still fetched at least every POLL_IDLE_INTERVAL, so
+    new or moved fixtures show up on busy days too. Failed polls back off
+    by doubling up to POLL_IDLE_INTERVAL. Competitions change slowly, so
+    they are refreshed every POLL_IDLE_INTERVAL. Each refresh waits for
+    room in the API rate budget instead of spending calls users need.
+    Polled matches stay fresh until after the next poll (polled_ttl), so
+    page requests only read the cache.
+    clock gives the time (tests pass a simulated one).
+    """
+    delay = POLL_LIVE_INTERVAL
+    last_slow_refresh = 0
+    last_full_refresh = 0
+    
+    while not stop_event.is_set():
+        stop_event.wait(seconds_until_api_token("live"))
+        schedule = poller_state["schedule"]
+        matches = None
+        if API_KEY:
+            if schedule and schedule["competitions"] and clock() - last_full_refresh < POLL_IDLE_INTERVAL:
+                matches = refresh_active_matches(schedule)
+            if matches is None:
+                matches = get_match_window(force=True, ttl=polled_ttl)
+                last_full_refresh = clock()
+        live_matches, using_fallback = get_live_matches(limit=None)
+        publish_live_changes(live_matches)
+        
+        if clock() - last_slow_refresh >= POLL_IDLE_INTERVAL:
+            stop_event.wait(seconds_until_api_token("competitions"))
+            get_competitions_data(force=True)
+            last_slow_refresh = clock()
+        
+        if matches is not None:
+            schedule = build_poll_schedule(get_match_store(matches), clock())
+            delay = schedule["delay"]
+        else:
+            schedule = None
+            delay = min(delay * 2, POLL_IDLE_INTERVAL)
+        
+        poller_state["schedule"] = schedule
+        poller_state["last_poll"] = clock()
+        poller_state["next_delay"] = delay
+        stop_event.wait(delay)
+
+def follow_live_changes(stop_event):
+    """Send live changes to this process's clients without ever calling the API.
+
+    Used in the gunicorn workers that don't run the poller: the cached
+    match window is read every POLL_LIVE_INTERVAL. With Redis that is the
+    cache the poller keeps fresh; with the in-process cache it is whatever
+    this worker's own page requests fetched.
+    """
+    while not stop_event.is_set():
+        matches = cached_match_window()
+        if matches is not None:
+            store = get_match_store(matches)
+            publish_live_changes(matches_between(store, start_of_day(0), start_of_day(1)))
+        stop_event.wait(POLL_LIVE_INTERVAL)
+
+def start_poller():
+    """Start the background poller thread (only once per process)"""
+    if poller_state["thread"] is None:
+        target = poll_upstream if poller_state["role"] == "leader" else follow_live_changes
+        thread = threading.Thread(target=target, args=(poller_state["stop"],),
+                                  name="poller", daemon=True)
+        poller_state["thread"] = thread
+        thread.start()
+    return poller_state["thread"]
+
+def match_key(match):
+    """Stable key for a match (the API id, or teams and kickoff for sample data)"""
+    if match.id is not None:
+        return str(match.id)
+    return f"{match.home_team.name}-{match.away_team.name}-{match.utc_date}"
+
+def match_score_state(match):
+    """The parts of a match that live clients care about"""
+    return (match.status, match.home_score, match.away_score)
+
+def competition_code(match):
+    """Competition code of a match, like PL or CL"""
+    return match.competition.code or COMPETITION_CODES.get(match.competition.name)
+
+def live_updates(live_matches):
+    """Display data for matches sent to live clients (with id and competition code)"""
+    return [dict(processed, id=match_key(match), competitionCode=competition_code(match))
+            for match, processed in zip(live_matches, process_live_matches(live_matches))]
+
+def select_updates(updates, codes):
+    """Keep only updates for the competitions a client subscribed to (None = all)"""
+    if codes is None:
+        return updates
+    return [update for update in updates if update["competitionCode"] in codes]
+
+def publish_live_changes(live_matches):
+    """Send matches whose status or score changed to every live client that wants them.
+
+    live_matches is all of today's matches; matches no longer in it are
+    forgotten, so live_state doesn't grow with every match ever seen.
+    """
+    changed = []
+    with live_lock:
+        seen = set()
+        for match in live_matches:
+            key = match_key(match)
+            seen.add(key)
+            state = match_score_state(match)
+            if live_state.get(key) != state:
+                live_state[key] = state
+                changed.append(match)
+        for key in live_state.keys() - seen:
+            del live_state[key]
+        subscribers = list(live_subscribers.items())
+    
+    if not changed or not subscribers:
+        return changed
+    
+    # Encode once per distinct subscription, not once per client
+    updates = live_updates(changed)
+    encoded = {}
+    for subscriber, codes in subscribers:
+        if codes not in encoded:
+            selected = select_updates(updates, codes)
+            encoded[codes] = to_json(selected) if selected else None
+        if encoded[codes] is None:
+            continue
+        try:
+            subscriber.put_nowait(encoded[codes])
+        except queue.Full:
+            # Too slow to keep up; the client reconnects and gets a fresh snapshot
+            with live_lock:
+                live_subscribers.pop(subscriber, None)
+    return changed
+
+def parse_competition_codes(value):
+    """Turn "PL,CL" into frozenset({"PL", "CL"}) (None when empty, meaning all competitions)"""
+    codes = frozenset(code.strip().upper() for code in (value or "").split(",") if code.strip())
+    return codes or None
+
+def sse_event(name, data):
+    """Format one Server-Sent Event (data is a JSON-serializable value or JSON bytes)"""
+    if not isinstance(data, bytes):
+        data = to_json(data)
+    return f"event: {name}\ndata: {data.decode()}\n\n"
+
+def stop_poller(timeout=None):
+    """Stop the poller thread and wait up to timeout seconds for it to finish"""
+    thread = poller_state["thread"]
+    poller_state["stop"].set()
+    if thread is not None:
+        thread.join(timeout)
+    poller_state["thread"] = None
+    poller_state["stop"] = threading.Event()
+
+def reset_after_fork():
+    """Give a forked worker its own threads, locks and connections.
+
+    Threads don't survive fork and sockets must not be shared between
+    processes, so the pools and the HTTP session are recreated. A lock
+    some other thread held at the fork would stay locked forever in the
+    child, so every lock is replaced, and calls that were in flight are
+    forgotten (their threads are gone). The poller is not restarted here:
+    serve() starts it after fork in one worker. The cached data and pages
+    stay, shared copy-on-write.
+    """
+    global upstream_pool, refresh_pool, api_session
+    global cache_lock, version_lock, snapshot_lock, live_lock, page_cache_lock, index_lock, circuit_lock, rate_lock
+    cache_lock, version_lock, snapshot_lock = threading.Lock(), threading.Lock(), threading.Lock()
+    live_lock, page_cache_lock, index_lock = threading.Lock(), threading.Lock(), threading.Lock()
+    circuit_lock, rate_lock = threading.Lock(), threading.Lock()
+    in_flight.clear()
+    circuit["probing"] = False
+    snapshot_state.update(pending={}, timer=None)  # The parent writes what it had queued
+    
+    upstream_pool = ThreadPoolExecutor(max_workers=upstream_pool._max_workers, thread_name_prefix="upstream")
+    refresh_pool = ThreadPoolExecutor(max_workers=refresh_pool._max_workers, thread_name_prefix="refresh")
+    api_session = create_api_session()
+    
+    poller_state["thread"] = None
+    poller_state["stop"] = threading.Event()
+
+os.register_at_fork(after_in_child=reset_after_fork)
+
+def warm_caches():
+    """Fetch all upstream data and render the busiest pages once (used before forking workers)"""
+    get_competitions_data()
+    get_live_matches()
+    get_upcoming_matches()
+    with app.test_client() as client:
+        for path in ("/", "/api/competitions", "/api/matches/live", "/api/matches/upcoming"):
+            client.get(path)
+
+def serve(bind, workers, threads, poller=False):
+    """Run the app on gunicorn with the caches warmed before the workers fork.
+
+    The app is preloaded in the master process, so every worker starts
+    with the warmed data and pages (shared copy-on-write). Only one
+    worker polls the API (one token bucket for the whole quota); the
+    others just pass cached changes on to their live clients. When that
+    worker dies, the next worker gunicorn starts takes over. Load test:
+        python app.py serve --workers 4 --threads 8 --bind 127.0.0.1:8000
+        ab -k -n 50000 -c 200 http://127.0.0.1:8000/
+    and repeat with --workers 1, 2, 4, ... up to the core count to see throughput scale.
+    """
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        raise SystemExit("The serve command needs gunicorn: pip install gunicorn")
+    
+    class FootballApplication(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", bind)
+            self.cfg.set("workers", workers)
+            self.cfg.set("threads", threads)
+            self.cfg.set("preload_app", True)
+            # gevent workers when FOOTBALL_ASYNC=1 (needed for many WebSocket/SSE clients)
+            self.cfg.set("worker_class", "gevent" if ASYNC_MODE else "gthread")
+            if ASYNC_MODE:
+                # Live clients stay connected, so one worker holds thousands (raise ulimit -n to match)
+                self.cfg.set("worker_connections", ASYNC_WORKER_CONNECTIONS)
+            self.cfg.set("pre_fork", pick_poller_worker)
+            self.cfg.set("post_fork", start_worker_poller)
+        
+        def load(self):
+            warm_caches()
+            return app
+    
+    def pick_poller_worker(server, worker):
+        # Runs in the master: the new worker polls unless a live worker already does
+        worker.runs_poller = not any(getattr(other, "runs_poller", False) for other in server.WORKERS.values())
+    
+    def start_worker_poller(server, worker):
+        # Runs in the new worker, after reset_after_fork
+        poller_state["role"] = "leader" if worker.runs_poller else "follower"
+        if poller:
+            start_poller()
+    
+    # A poller started at import (FOOTBALL_POLLER=1) must not be running when we fork
+    poller = poller or poller_state["thread"] is not None
+    stop_poller(timeout=API_TIMEOUTS["matches"])
+    FootballApplication().run()
+
+def fetch_all(fetchers, deadline=PAGE_DEADLINE):
+    """Run several fetchers at the same time and collect their results.
+
+    fetchers maps a name to (fetch_function, fallback_data). Every fetch
+    function returns (data, using_fallback). Anything not finished before
+    the deadline (or that raised) gets its fallback data instead.
+    """
+    futures = {name: upstream_pool.submit(fetch) for name, (fetch, _) in fetchers.items()}
+    wait(futures.values(), timeout=deadline)
+    
+    results = {}
+    for name, future in futures.items():
+        if future.done() and future.exception() is None:
+            results[name] = future.result()
+        else:
+            results[name] = (fetchers[name][1], True)
+    return results
+
+def build_competition_index(competitions):
+    """Build lookups and derived lists for search, filter, sort and dropdowns (once per data refresh)"""
+    names = [comp.name.lower() for comp in competitions]
+    codes = [comp.code.lower() for comp in competitions]
+    
+    # Word -> positions of competitions whose name or code has that word
+    tokens = {}
+    for position, (name, code) in enumerate(zip(names, codes)):
+        for token in name.split() + [code]:
+            tokens.setdefault(token, set()).add(position)
+    
+    by_country = {}
+    area_counts = {}
+    for position, comp in enumerate(competitions):
+        area_name = comp.area.name
+        by_country.setdefault(area_name.lower(), set()).add(position)
+        if area_name:
+            area_counts[area_name] = area_counts.get(area_name, 0) + 1
+    
+    # Positions in display order for each sort option (sorted() is stable like list.sort)
+    orders = {
+        'name': sorted(range(len(competitions)), key=lambda i: competitions[i].name),
+        'country': sorted(range(len(competitions)), key=lambda i: competitions[i].area.name)
+    }
+    
+    return {
+        "competitions": competitions,
+        "names": names,
+        "codes": codes,
+        "tokens": tokens,
+        "by_country": by_country,
+        "orders": orders,
+        "sorted": {sort: [competitions[i] for i in order] for sort, order in orders.items()},
+        "countries": sorted(area_counts),  # For the country filter dropdown
+        "area_counts": area_counts,  # Number of competitions per country
+        "word_matches": {}
+    }
+
+def get_competition_index(competitions):
+    """Get the index for this competitions list, building it only when the data changed"""
+    with index_lock:
+        if competition_index["source"] is not competitions:
+            competition_index["index"] = build_competition_index(competitions)
+            competition_index["source"] = competitions
+        return competition_index["index"]
+
+def search_positions(index, search_query):
+    """Find competitions whose lowercase name or code contains search_query"""
+    words = search_query.split()
+    candidates = None
+    for word in words:
+        # Every word of the query must be inside one word of the name or code
+        matches = index["word_matches"].get(word)
+        if matches is None:
+            matches = set()
+            for token, positions in index["tokens"].items():
+                if word in token:
+                    matches |= positions
+            if len(index["word_matches"]) < 10000:
+                index["word_matches"][word] = matches
+        candidates = matches if candidates is None else candidates & matches
+    
+    if candidates is None:
+        candidates = range(len(index["competitions"]))
+    
+    # Check the whole query (it can span words) only on the few candidates left
+    return {i for i in candidates
+            if search_query in index["names"][i] or search_query in index["codes"][i]}
+
+def query_competitions(index, search_query, filter_country, sort_by):
+    """Search, filter and sort competitions using a prebuilt index"""
+    if not search_query and not filter_country:
+        return index["sorted"].get(sort_by, index["competitions"])
+    
+    selected = None
+    if search_query:
+        selected = search_positions(index, search_query)
+    if filter_country:
+        in_country = index["by_country"].get(filter_country.lower(), set())
+        selected = in_country if selected is None else selected & in_country
+    
+    order = index["orders"].get(sort_by, range(len(index["competitions"])))
+    competitions = index["competitions"]
+    return [competitions[i] for i in order if i in selected]
+
+def get_cached_page(key):
+    """Get a cached page entry (None if missing, expired or built on old data)"""
+    with page_cache_lock:
+        entry = page_cache.get(key)
+        if entry and (entry["version"] is None or entry["version"] == data_version["number"]) \
+                and time.time() < entry["expires"]:
+            page_cache.move_to_end(key)
+            page_cache_state["hits"] += 1
+            return entry
+        if entry:
+            remove_cached_page(key)
+        page_cache_state["misses"] += 1
+        return None
+
+def make_page_entry(body, version, modified, ttl):
+    """Wrap a rendered page with what we need to serve it again.
+
+    The page is compressed here, once per render, so every request after
+    that just picks the stored bytes for its Accept-Encoding.
+    """
+    data = body.encode() if isinstance(body, str) else body
+    bodies = {"identity": data}
+    if len(data) >= COMPRESS_MIN_SIZE:
+        bodies["gzip"] = gzip.compress(data, compresslevel=6, mtime=0)  # No timestamp, so every worker makes the same bytes
+        if brotli:
+            bodies["br"] = brotli.compress(data, quality=5)
+    
+    return {
+        "bodies": bodies,
+        "size": sum(len(encoded) for encoded in bodies.values()),
+        "etag": hashlib.sha1(data).hexdigest(),  # Strong ETag: same bytes, same tag in every worker
+        "modified": datetime.fromtimestamp(int(modified), tz=timezone.utc),
+        "version": version,
+        "expires": time.time() + ttl
     }
-    return status_map.get(status, status)
+
+def set_cached_page(key, entry):
+    """Store a page entry, dropping least recently used pages to stay under the budget"""
+    if entry["size"] > PAGE_CACHE_MAX_BYTES:
+        return
+    with page_cache_lock:
+        if key in page_cache:
+            remove_cached_page(key)
+        page_cache[key] = entry
+        page_cache_state["bytes"] += entry["size"]
+        while page_cache_state["bytes"] > PAGE_CACHE_MAX_BYTES:
+            remove_cached_page(next(iter(page_cache)))
+
+def remove_cached_page(key):
+    """Drop one page from the page cache (call with page_cache_lock held)"""
+    entry = page_cache.pop(key)
+    page_cache_state["bytes"] -= entry["size"]
+
+def page_response(entry, max_age, mimetype="text/html", vary_cookie=False):
+    """Build the response for a page entry, or a 304 if the browser already has it.
+
+    vary_cookie is for pages that depend on the tz cookie, so caches keep one copy per cookie.
+    """
+    # Pick the best compression the browser accepts among the ones we stored
+    encoding = request.accept_encodings.best_match([name for name in ("br", "gzip") if name in entry["bodies"]])
+    encoding = encoding or "identity"
+    
+    response = Response(entry["bodies"][encoding], mimetype=mimetype)
+    response.vary.add("Accept-Encoding")
+    if vary_cookie:
+        response.vary.add("Cookie")  # The tz cookie changes match times
+    if encoding == "identity":
+        response.set_etag(entry["etag"])
+    else:
+        response.headers["Content-Encoding"] = encoding
+        response.set_etag(f'{entry["etag"]}-{encoding}')  # Different bytes need a different strong ETag
+    response.last_modified = entry["modified"]
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    # Turns the response into a body-less 304 when If-None-Match / If-Modified-Since match
+    return response.make_conditional(request)
+
+def cached_page(uses_data=True, max_age=PAGE_CACHE_DURATION, mimetype="text/html", uses_timezone=False):
+    """Cache a view's rendered page by path and the query args that matter.
+
+    Pages built on API data are tied to the data version, so they are
+    dropped as soon as the API cache gets new data. Pages that don't use
+    API data are kept until they are pushed out of the cache. Views that
+    show match times (uses_timezone) get one page per timezone, and
+    Vary: Cookie since the zone can come from the tz cookie. Responses
+    get ETag, Last-Modified and Cache-Control (max_age seconds) headers.
+    Views return the rendered page as str, or bytes for other mimetypes.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            zone = get_request_timezone() if uses_timezone else None
+            key = (request.path,) + tuple(request.args.get(name, '') for name in PAGE_CACHE_ARGS) \
+                + (zone.key if zone else '',)
+            entry = get_cached_page(key)
+            if entry is not None:
+                return page_response(entry, max_age, mimetype, vary_cookie=uses_timezone)
+            
+            version = data_version["number"] if uses_data else None
+            modified = data_version["timestamp"] if uses_data else APP_STARTED
+            body = view(*args, **kwargs)
+            if not isinstance(body, (str, bytes)) or g.get("skip_page_cache"):
+                return body
+            
+            entry = make_page_entry(body, version, modified, PAGE_CACHE_DURATION if uses_data else float("inf"))
+            set_cached_page(key, entry)
+            return page_response(entry, max_age, mimetype, vary_cookie=uses_timezone)
+        return wrapper
+    return decorator
+
+def process_live_matches(live_matches, zone=None):
+    """What the live matches list shows (prebuilt on each match when the data arrived)"""
+    if zone is None:
+        return [match.live_view for match in live_matches]
+    return [match.views_for(zone)[0] for match in live_matches]
+
+def process_upcoming_matches(upcoming_matches, zone=None):
+    """What the upcoming matches list shows (prebuilt on each match when the data arrived)"""
+    if zone is None:
+        return [match.upcoming_view for match in upcoming_matches]
+    return [match.views_for(zone)[1] for match in upcoming_matches]
+
+def get_request_timezone():
+    """Timezone from ?tz= or the tz cookie, like Europe/Paris (None means server time)"""
+    name = request.args.get('tz') or request.cookies.get('tz')
+    if not name:
+        return None
+    try:
+        return ZoneInfo(name)
+    except (ValueError, KeyError):
+        # Unknown or malformed name: show server time like before
+        return None
 
 @app.route("/")
+@cached_page(max_age=LIVE_PAGE_MAX_AGE, uses_timezone=True)
 def home():
     try:
         # Get query parameters
         search_query = request.args.get('search', '').lower()
         sort_by = request.args.get('sort', 'name')
         filter_country = request.args.get('country', '')
+        zone = get_request_timezone()
         
-        # Get competitions data
-        competitions, using_fallback = get_competitions_data()
-        
-        # Get live matches
-        live_matches, matches_fallback = get_live_matches()
-        
-        # Get upcoming matches (simple feature for beginners)
-        upcoming_matches, upcoming_fallback = get_upcoming_matches()
-        
-        # Process live matches for display
-        processed_matches = []
-        for match in live_matches:
-            processed_match = {
-                'homeTeam': match.get('homeTeam', {}).get('name', 'Unknown'),
-                'awayTeam': match.get('awayTeam', {}).get('name', 'Unknown'),
-                'homeScore': match.get('score', {}).get('fullTime', {}).get('home'),
-                'awayScore': match.get('score', {}).get('fullTime', {}).get('away'),
-                'status': get_match_status_display(match.get('status', 'UNKNOWN')),
-                'competition': match.get('competition', {}).get('name', 'Unknown'),
-                'time': format_match_time(match.get('utcDate', '')),
-                'is_live': match.get('status') == 'IN_PLAY'
-            }
-            processed_matches.append(processed_match)
+        # Get competitions, live matches and upcoming matches at the same time
+        # so the page waits for the slowest call instead of all three in a row
+        results = fetch_all({
+            "competitions": (get_competitions_data, FALLBACK_COMPETITIONS),
+            "live": (lambda: get_live_matches(zone=zone), FALLBACK_MATCHES),
+            "upcoming": (lambda: get_upcoming_matches(zone=zone), FALLBACK_UPCOMING_MATCHES)
+        })
+        competitions, using_fallback = results["competitions"]
+        live_matches, matches_fallback = results["live"]
+        upcoming_matches, upcoming_fallback = results["upcoming"]
         
-        # Process upcoming matches for display (simple approach)
-        processed_upcoming = []
-        for match in upcoming_matches:
-            upcoming_match = {
-                'homeTeam': match.get('homeTeam', {}).get('name', 'Unknown'),
-                'awayTeam': match.get('awayTeam', {}).get('name', 'Unknown'),
-                'competition': match.get('competition', {}).get('name', 'Unknown'),
-                'date': format_upcoming_date(match.get('utcDate', '')),
-                'time': format_match_time(match.get('utcDate', ''))
-            }
-            processed_upcoming.append(upcoming_match)
+        # Process matches for display
+        processed_matches = process_live_matches(live_matches, zone)
+        processed_upcoming = process_upcoming_matches(upcoming_matches, zone)
         
-        # Filter by search query
-        if search_query:
-            competitions = [comp for comp in competitions 
-                          if search_query in comp.get('name', '').lower() 
-                          or search_query in comp.get('code', '').lower()]
+        # Filter by search query and country, then sort (using the prebuilt index)
+        index = get_competition_index(competitions)
+        competitions = query_competitions(index, search_query, filter_country, sort_by)
         
-        # Filter by country
-        if filter_country:
-            competitions = [comp for comp in competitions 
-                          if comp.get('area', {}).get('name', '').lower() == filter_country.lower()]
-        
-        # Sort competitions
-        if sort_by == 'name':
-            competitions.sort(key=lambda x: x.get('name', ''))
-        elif sort_by == 'country':
-            competitions.sort(key=lambda x: x.get('area', {}).get('name', ''))
-        
-        # Get unique countries for filter dropdown (from all available data)
-        all_competitions = get_competitions_data()[0]  # Get all competitions for countries list
-        countries = sorted(list(set([comp.get('area', {}).get('name', '') 
-                                   for comp in all_competitions 
-                                   if comp.get('area', {}).get('name')])))
+        # Unique countries for filter dropdown (worked out once per data refresh)
+        countries = index["countries"]
         
         # Prepare status message
         status_message = None
+        data_age = cache_age(cache_key("competitions"))
         if using_fallback:
             status_message = " Using sample data - Live API data will load when available."
+        elif data_age is not None and data_age > CACHE_DURATION:
+            status_message = f" Showing saved data from {int(data_age // 60)} minutes ago - Live API data will load when available."
         
         return render_template("index.html", 
                              competitions=competitions, 
@@ -274,6 +1506,7 @@ def home():
     except Exception as e:
         # Fallback to sample data with error message
         error_message = "Unable to load data. Showing sample competitions."
+        g.skip_page_cache = True  # Try again on the next request
         
         return render_template("index.html", 
                              competitions=FALLBACK_COMPETITIONS[:5], 
@@ -335,6 +1568,7 @@ def get_competition_teams(competition_name):
     return competition_teams.get(comp_key, [])
 
 @app.route("/competition/<competition_name>")
+@cached_page(uses_data=False, max_age=STATIC_PAGE_MAX_AGE)
 def competition_details(competition_name):
     """Show competition details with teams (simple version)"""
     teams = get_competition_teams(competition_name)
@@ -408,6 +1642,7 @@ def get_team_info(team_name):
     return teams.get(team_key, None)
 
 @app.route("/team/<team_name>")
+@cached_page(uses_data=False, max_age=STATIC_PAGE_MAX_AGE)
 def team_details(team_name):
     """Show team details page (simple version)"""
     team_info = get_team_info(team_name)
@@ -417,10 +1652,253 @@ def team_details(team_name):
     else:
         return render_template("team.html", team=None, team_name=team_name)
 
+def to_json(data):
+    """Serialize data for the JSON API (orjson when installed)"""
+    if orjson:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+
+def json_error(message, status):
+    """JSON error response (not cached)"""
+    return Response(to_json({"error": message}), status=status, mimetype="application/json")
+
+@app.route("/api/competitions")
+@cached_page(max_age=LIVE_PAGE_MAX_AGE, mimetype="application/json")
+def api_competitions():
+    """Competitions as JSON, with the same search/country/sort params as the home page"""
+    competitions, using_fallback = get_competitions_data()
+    index = get_competition_index(competitions)
+    competitions = query_competitions(index, request.args.get('search', '').lower(),
+                                      request.args.get('country', ''), request.args.get('sort', 'name'))
+    return to_json({
+        "competitions": [comp.to_api() for comp in competitions],
+        "countries": index["countries"],
+        "using_fallback": using_fallback
+    })
+
+@app.route("/api/matches/live")
+@cached_page(max_age=LIVE_PAGE_MAX_AGE, mimetype="application/json", uses_timezone=True)
+def api_live_matches():
+    """Today's matches as JSON (same fields as the home page list)"""
+    zone = get_request_timezone()
+    live_matches, using_fallback = get_live_matches(zone=zone)
+    return to_json({"matches": process_live_matches(live_matches, zone), "using_fallback": using_fallback})
+
+@app.route("/api/matches/upcoming")
+@cached_page(max_age=LIVE_PAGE_MAX_AGE, mimetype="application/json", uses_timezone=True)
+def api_upcoming_matches():
+    """Upcoming matches as JSON (same fields as the home page list)"""
+    zone = get_request_timezone()
+    upcoming_matches, using_fallback = get_upcoming_matches(zone=zone)
+    return to_json({"matches": process_upcoming_matches(upcoming_matches, zone), "using_fallback": using_fallback})
+
+@app.route("/api/matches/recent")
+@cached_page(max_age=LIVE_PAGE_MAX_AGE, mimetype="application/json", uses_timezone=True)
+def api_recent_results():
+    """Finished matches from the last few days as JSON"""
+    zone = get_request_timezone()
+    recent_matches, using_fallback = get_recent_results(zone=zone)
+    return to_json({"matches": process_live_matches(recent_matches, zone), "using_fallback": using_fallback})
+
+@app.route("/api/competition/<competition_name>/teams")
+@cached_page(uses_data=False, max_age=STATIC_PAGE_MAX_AGE, mimetype="application/json")
+def api_competition_teams(competition_name):
+    """Teams in a competition as JSON"""
+    teams = get_competition_teams(competition_name)
+    if not teams:
+        return json_error("Competition not found", 404)
+    return to_json({"competition": competition_name.replace("-", " ").title(), "teams": teams})
+
+@app.route("/api/team/<team_name>")
+@cached_page(uses_data=False, max_age=STATIC_PAGE_MAX_AGE, mimetype="application/json")
+def api_team(team_name):
+    """Team details as JSON"""
+    team_info = get_team_info(team_name)
+    if not team_info:
+        return json_error("Team not found", 404)
+    return to_json(team_info)
+
+@app.route("/events/live")
+def live_events():
+    """Stream live score changes with Server-Sent Events.
+
+    Every client shares the one background poller, so upstream traffic
+    stays the same no matter how many people are watching. Pass
+    ?competitions=PL,CL to only get those competitions.
+    """
+    start_poller()
+    codes = parse_competition_codes(request.args.get("competitions"))
+    # Subscribe before taking the snapshot, so a change published in between is not lost
+    subscriber = queue.Queue(maxsize=SSE_QUEUE_SIZE)
+    with live_lock:
+        live_subscribers[subscriber] = codes
+    live_matches, _ = get_live_matches(limit=None)
+    publish_live_changes(live_matches)  # So the first poll doesn't resend what the snapshot has
+    
+    def stream():
+        try:
+            # Start with every match, then only the ones that change
+            yield sse_event("snapshot", select_updates(live_updates(live_matches), codes))
+            while True:
+                with live_lock:
+                    if subscriber not in live_subscribers:
+                        return
+                try:
+                    yield sse_event("update", subscriber.get(timeout=SSE_KEEPALIVE))
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+        finally:
+            with live_lock:
+                live_subscribers.pop(subscriber, None)
+    
+    return Response(stream(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+def live_socket(ws):
+    """Live score changes over a WebSocket, only for the competitions the client picks.
+
+    The client sends {"subscribe": ["PL", "CL"]} or {"unsubscribe": ["CL"]}
+    (or connects with ?competitions=PL,CL) and gets a snapshot of those
+    competitions, then {"type": "update", "matches": [...]} messages.
+    Run under gevent (gunicorn -k gevent) to hold many idle connections.
+    """
+    start_poller()
+    subscriber = queue.Queue(maxsize=SSE_QUEUE_SIZE)
+    codes = parse_competition_codes(request.args.get("competitions")) or frozenset()
+    with live_lock:
+        live_subscribers[subscriber] = codes
+    
+    def send_snapshot():
+        live_matches, _ = get_live_matches(limit=None)
+        publish_live_changes(live_matches)
+        with live_lock:
+            wanted = live_subscribers.get(subscriber, frozenset())
+        ws.send(to_json({"type": "snapshot", "matches": select_updates(live_updates(live_matches), wanted)}).decode())
+    
+    def read_messages():
+        # Runs next to the sending loop so a quiet client never blocks updates
+        try:
+            while True:
+                message = json.loads(ws.receive())
+                with live_lock:
+                    if subscriber not in live_subscribers:
+                        break  # Dropped for falling behind; the sending loop closes the socket
+                    wanted = set(live_subscribers[subscriber])
+                    wanted |= {code.upper() for code in message.get("subscribe", [])}
+                    wanted -= {code.upper() for code in message.get("unsubscribe", [])}
+                    live_subscribers[subscriber] = frozenset(wanted)
+                subscriber.put(b"snapshot")
+        except Exception:
+            # Closed connection (or a message we can't read): stop the sending loop
+            subscriber.put(None)
+    
+    threading.Thread(target=read_messages, daemon=True).start()
+    try:
+        if codes:
+            send_snapshot()
+        while True:
+            with live_lock:
+                if subscriber not in live_subscribers:
+                    # Too slow to keep up: returning closes the socket, so the client
+                    # reconnects and gets a fresh snapshot
+                    return
+            try:
+                update = subscriber.get(timeout=SSE_KEEPALIVE)
+            except queue.Empty:
+                ws.send(to_json({"type": "ping"}).decode())
+                continue
+            if update is None:
+                return
+            if update == b"snapshot":
+                send_snapshot()
+            else:
+                ws.send('{"type":"update","matches":' + update.decode() + "}")
+    finally:
+        with live_lock:
+            live_subscribers.pop(subscriber, None)
+
+if sock:
+    sock.route("/ws/live")(live_socket)
+
+@app.route("/debug/cache")
+def cache_debug():
+    """Show cache hit/miss counters and what is cached right now"""
+    now = time.time()
+    entries = api_cache.items()
+    with cache_lock:
+        return jsonify({
+            "hits": cache_stats["hits"],
+            "misses": cache_stats["misses"],
+            "stale": cache_stats["stale"],
+            "in_flight": list(in_flight),
+            "data_version": data_version["number"],
+            "live_clients": len(live_subscribers),
+            "circuit": dict(circuit),
+            "rate_budget": {"tokens": round(rate_budget["tokens"], 2),
+                            "limit": RATE_LIMIT_PER_MINUTE,
+                            "reset_in": round(rate_budget["reset_at"] - now) if rate_budget["reset_at"] else None,
+                            "denied": dict(rate_budget["denied"])},
+            "pages": {"count": len(page_cache), **page_cache_state},
+            "poller": {"running": poller_state["thread"] is not None,
+                       "last_poll": poller_state["last_poll"],
+                       "next_delay": poller_state["next_delay"]},
+            "entries": {key: {"items": len(entry["data"]), "expires_in": round(entry["expires"] - now)}
+                        for key, entry in entries}
+        })
+
+@app.route("/debug/schedule")
+def schedule_debug():
+    """Show when and what the poller polls, from the cached match window (?at=<unix time> to simulate)"""
+    try:
+        now = float(request.args.get("at", time.time()))
+    except ValueError:
+        now = None
+    if now is None or not math.isfinite(now):
+        return json_error("at must be a Unix time", 400)
+    matches = cached_match_window()
+    schedule = build_poll_schedule(get_match_store(matches), now) if matches is not None else None
+    return jsonify({
+        "at": now,
+        "schedule": schedule,
+        "poller": {"running": poller_state["thread"] is not None,
+                   "last_poll": poller_state["last_poll"],
+                   "next_delay": poller_state["next_delay"],
+                   "schedule": poller_state["schedule"]}
+    })
+
+# Start from the last saved API data so the first requests don't wait for (or miss) the API
+load_snapshot()
+atexit.register(save_snapshot)  # Write changes still waiting for the snapshot timer
+
+# Servers that import the app (like gunicorn) can turn the poller on with an env var
+# (one poller per process that imports it; with several workers use "serve --poller")
+if os.environ.get("FOOTBALL_POLLER") == "1":
+    start_poller()
+
 if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser()
     parser.add_argument('--port', type=int, default=5001, help='Port to run the server on')
+    parser.add_argument('--poller', action='store_true', help='Refresh upstream data in the background')
+    commands = parser.add_subparsers(dest='command')
+    serve_parser = commands.add_parser('serve', help='Run with gunicorn for production')
+    serve_parser.add_argument('--bind', default='0.0.0.0:5001', help='Address to listen on (host:port)')
+    serve_parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Worker processes')
+    serve_parser.add_argument('--threads', type=int, default=8, help='Threads per worker')
+    serve_parser.add_argument('--poller', action='store_true', help='Refresh upstream data in the background')
     args = parser.parse_args()
     
-    app.run(host="0.0.0.0", port=args.port)
+    if args.command == 'serve':
+        serve(args.bind, args.workers, args.threads, poller=args.poller)
+        raise SystemExit(0)
+    
+    if args.poller:
+        start_poller()
+    
+    if ASYNC_MODE:
+        # FOOTBALL_ASYNC=1 python app.py: one process holds thousands of waiting requests
+        from gevent.pywsgi import WSGIServer
+        print(f"Serving with gevent on port {args.port}")
+        WSGIServer(("0.0.0.0", args.port), app).serve_forever()
+    else:
+        app.run(host="0.0.0.0", port=args.port)
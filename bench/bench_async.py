@@ -0,0 +1,90 @@
+"""How many waiting requests one worker holds: gthread (8 threads) vs gevent (FOOTBALL_ASYNC=1).
+
+    python bench/bench_async.py [clients ...]
+
+Starts `app.py serve --workers 1 --threads 8` twice against a stub that
+answers after 500 ms. Cached pages and single-flight mean a burst of page
+requests makes one upstream call, so the requests that tie up a worker are
+the long waits: here Server-Sent Events clients on /events/live, each
+holding its request open. With N of them connected it times a plain
+/api/competitions request. gthread has no thread left once N >= 8;
+gevent keeps answering.
+"""
+import os
+import select
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+import requests
+
+from stub_api import ROOT, StubAPI, app_environment
+
+CLIENTS = [int(arg) for arg in sys.argv[1:]] or [4, 8, 64, 512]
+PROBE_TIMEOUT = 5
+
+stub = StubAPI(latency=0.5)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(async_mode):
+    port = free_port()
+    env = app_environment(stub, FOOTBALL_ASYNC="1" if async_mode else "0")
+    server = subprocess.Popen([sys.executable, os.path.join(ROOT, "app.py"), "serve", "--workers", "1",
+                               "--threads", "8", "--bind", f"127.0.0.1:{port}"],
+                              env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+    base = f"http://127.0.0.1:{port}"
+    for _ in range(200):
+        try:
+            requests.get(f"{base}/api/competitions", timeout=1)
+            return server, base, port
+        except requests.RequestException:
+            time.sleep(0.1)
+    os.killpg(server.pid, signal.SIGKILL)
+    raise SystemExit("server did not start")
+
+
+def open_streams(port, count):
+    """Connect count SSE clients and wait for each one's first event"""
+    streams = []
+    for _ in range(count):
+        sock = socket.create_connection(("127.0.0.1", port))
+        sock.sendall(b"GET /events/live HTTP/1.1\r\nHost: bench\r\n\r\n")
+        streams.append(sock)
+    waiting, deadline = set(streams), time.time() + 2
+    while waiting and time.time() < deadline:
+        ready, _, _ = select.select(list(waiting), [], [], 0.1)
+        waiting.difference_update(ready)
+    return streams, count - len(waiting)
+
+
+def probe(base):
+    started = time.perf_counter()
+    try:
+        requests.get(f"{base}/api/competitions", timeout=PROBE_TIMEOUT)
+    except requests.Timeout:
+        return None
+    return time.perf_counter() - started
+
+
+for label, async_mode in (("gthread, 8 threads", False), ("gevent (FOOTBALL_ASYNC=1)", True)):
+    print(label)
+    for count in CLIENTS:
+        server, base, port = start_server(async_mode)
+        try:
+            streams, served = open_streams(port, count)
+            took = probe(base)
+            result = f"{took * 1000:7.1f} ms" if took is not None else f"no answer in {PROBE_TIMEOUT} s"
+            print(f"  {count:>4} streams open ({served:>4} being served)   /api/competitions: {result}")
+            for sock in streams:
+                sock.close()
+        finally:
+            os.killpg(server.pid, signal.SIGKILL)  # Master and worker; SIGTERM would wait for the open streams
+            server.wait()
@@ -0,0 +1,51 @@
+"""Bytes on the wire and CPU per request for a cached page, with and without precompression.
+
+    python bench/bench_compression.py [requests]
+
+Benchmarks "/" when the templates folder is there, otherwise
+/api/competitions (same page cache and compression path). Compares:
+  identity        - the uncompressed cached page
+  gzip per request - compressing the cached page on every response (what a
+                     compression middleware does)
+  precompressed   - the gzip/br bytes stored with the page (what the app does)
+"""
+import gzip
+import os
+import sys
+import time
+
+from stub_api import StubAPI, load_app
+
+REQUESTS = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+football = load_app(StubAPI(competitions=300, matches=40))
+client = football.app.test_client()
+has_templates = os.path.isdir(os.path.join(football.app.root_path, football.app.template_folder))
+path = "/" if has_templates else "/api/competitions"
+print(f"page: {path}")
+
+football.get_competitions_data()
+football.get_live_matches()
+client.get(path)  # Build and cache the page
+
+
+def cpu_per_request(headers, compress_again=False):
+    started = time.process_time()
+    for _ in range(REQUESTS):
+        response = client.get(path, headers=headers)
+        if compress_again:
+            gzip.compress(response.data, compresslevel=6)
+    return (time.process_time() - started) / REQUESTS * 1000
+
+
+identity = client.get(path)
+print(f"{'identity':<18} {len(identity.data):>8} bytes   {cpu_per_request({}):.3f} ms CPU/request")
+print(f"{'gzip per request':<18} {len(gzip.compress(identity.data, compresslevel=6)):>8} bytes   "
+      f"{cpu_per_request({}, compress_again=True):.3f} ms CPU/request")
+for encoding in ("gzip", "br"):
+    response = client.get(path, headers={"Accept-Encoding": encoding})
+    if response.headers.get("Content-Encoding") != encoding:
+        print(f"{'precompressed ' + encoding:<18} not available (pip install brotli)")
+        continue
+    print(f"{'precompressed ' + encoding:<18} {len(response.data):>8} bytes   "
+          f"{cpu_per_request({'Accept-Encoding': encoding}):.3f} ms CPU/request")
@@ -0,0 +1,42 @@
+"""Home page upstream latency: the three fetchers one after another vs fetch_all() at the same time.
+
+    python bench/bench_fanout.py [rounds]
+
+Every round starts with empty caches so each fetcher goes to the stub,
+which answers after 100-300 ms (like a slow football-data.org). Live and
+upcoming matches share one match-window call, so each round makes two
+upstream calls either way.
+"""
+import sys
+import time
+
+from stub_api import StubAPI, load_app, report, reset_caches
+
+ROUNDS = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+
+stub = StubAPI(latency=(0.1, 0.3))
+football = load_app(stub)
+
+
+def serial():
+    football.get_competitions_data()
+    football.get_live_matches()
+    football.get_upcoming_matches()
+
+
+def concurrent():
+    football.fetch_all({
+        "competitions": (football.get_competitions_data, football.FALLBACK_COMPETITIONS),
+        "live": (football.get_live_matches, football.FALLBACK_MATCHES),
+        "upcoming": (football.get_upcoming_matches, football.FALLBACK_UPCOMING_MATCHES),
+    })
+
+
+for label, run in (("serial (old home())", serial), ("fetch_all (concurrent)", concurrent)):
+    timings = []
+    for _ in range(ROUNDS):
+        reset_caches(football)
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+    report(label, timings)
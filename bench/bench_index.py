@@ -0,0 +1,73 @@
+"""Competition search/filter/sort: the old list-comprehension path vs the prebuilt index.
+
+    python bench/bench_index.py [competitions]
+
+Uses a synthetic catalogue (10k competitions by default). The old path
+is home()'s code from before the index, run on the raw API dicts; both
+paths must give the same competitions in the same order.
+"""
+import random
+import sys
+import time
+
+from stub_api import COUNTRIES, StubAPI, load_app, report
+
+SIZE = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+QUERIES = [("", "", "name"), ("", "Spain", "country"), ("cup", "", "name"), ("premier", "England", "name"),
+           ("super league", "", "country"), ("zz", "", "name"), ("l12", "", "name")]
+WORDS = ["Premier", "Super", "First", "Second", "National", "Cup", "League", "Division", "Liga", "Serie",
+         "Championship", "Primera", "Pro", "Open", "Youth", "Women's", "Regional", "Trophy"]
+
+random.seed(1)
+catalogue = [{"name": " ".join(random.sample(WORDS, 3)) + f" {number}", "code": f"L{number}",
+              "area": {"name": random.choice(COUNTRIES)}, "plan": "TIER_ONE"} for number in range(SIZE)]
+
+football = load_app(StubAPI())
+records = football.decode_items("competitions", catalogue)
+
+
+def old_path(competitions, search_query, filter_country, sort_by):
+    # home() before the index: scan, scan, sort, then rebuild the countries list
+    if search_query:
+        competitions = [comp for comp in competitions
+                        if search_query in comp.get('name', '').lower()
+                        or search_query in comp.get('code', '').lower()]
+    if filter_country:
+        competitions = [comp for comp in competitions
+                        if comp.get('area', {}).get('name', '').lower() == filter_country.lower()]
+    competitions = list(competitions)
+    if sort_by == 'name':
+        competitions.sort(key=lambda x: x.get('name', ''))
+    elif sort_by == 'country':
+        competitions.sort(key=lambda x: x.get('area', {}).get('name', ''))
+    countries = sorted(set(comp.get('area', {}).get('name', '') for comp in catalogue
+                           if comp.get('area', {}).get('name')))
+    return competitions, countries
+
+
+def indexed_path(search_query, filter_country, sort_by):
+    index = football.get_competition_index(records)
+    return football.query_competitions(index, search_query, filter_country, sort_by), index["countries"]
+
+
+started = time.perf_counter()
+football.get_competition_index(records)
+print(f"index build for {SIZE} competitions: {(time.perf_counter() - started) * 1000:.1f} ms (once per refresh)")
+
+for query in QUERIES:
+    old, _ = old_path(catalogue, *query)
+    new, _ = indexed_path(*query)
+    assert [comp["name"] for comp in old] == [comp.name for comp in new], query
+
+old_timings, new_timings = [], []
+for _ in range(20):
+    for query in QUERIES:
+        started = time.perf_counter()
+        old_path(catalogue, *query)
+        old_timings.append(time.perf_counter() - started)
+        started = time.perf_counter()
+        indexed_path(*query)
+        new_timings.append(time.perf_counter() - started)
+
+report("list comprehensions (old)", old_timings)
+report("prebuilt index", new_timings)
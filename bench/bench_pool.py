@@ -0,0 +1,40 @@
+"""Upstream call latency: a bare requests.get per call vs the shared pooled session.
+
+    python bench/bench_pool.py [calls]
+
+The stub runs locally over plain HTTP, so the saving shown is the TCP
+handshake and connection setup only; against api.football-data.org a new
+connection also pays a TLS handshake and a longer round trip.
+"""
+import sys
+import time
+
+import requests
+
+from stub_api import StubAPI, load_app, report
+
+CALLS = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+
+stub = StubAPI(competitions=20)
+football = load_app(stub)
+url = f"{stub.base}/competitions"
+headers = {"X-Auth-Token": "bench"}
+
+
+def bare():
+    requests.get(url, headers=headers, timeout=10)
+
+
+def pooled():
+    football.api_session.get(url, timeout=10)
+
+
+for label, call in (("requests.get (old)", bare), ("api_session (pooled)", pooled)):
+    connections_before = stub.connections
+    timings = []
+    for _ in range(CALLS):
+        started = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - started)
+    report(label, timings)
+    print(f"{'':<28} {stub.connections - connections_before} new connections for {CALLS} calls")
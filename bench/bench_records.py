@@ -0,0 +1,79 @@
+"""A large /v4/matches payload kept as raw dicts vs decoded once into Match records.
+
+    python bench/bench_records.py [matches]
+
+The payload has the upstream shape (areas, seasons, referees, odds and
+crests the app never shows), 5000 matches by default. Reports the memory
+the kept data takes (tracemalloc), the decode time per refresh, and the
+time to read the shown fields of every match (which every request did
+before the records).
+"""
+import gc
+import json
+import sys
+import time
+import tracemalloc
+
+from stub_api import StubAPI, load_app, make_matches, report
+
+SIZE = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+ROUNDS = 10
+
+football = load_app(StubAPI())
+payload = json.dumps({"matches": make_matches(SIZE)}).encode()
+print(f"payload: {SIZE} matches, {len(payload) / 1024:.0f} KiB of JSON")
+
+
+def raw_dicts():
+    return json.loads(payload)["matches"]
+
+
+def records():
+    return football.decode_items("matches", json.loads(payload)["matches"])
+
+
+def kept_bytes(decode):
+    """Memory still held by the decoded data once the raw JSON objects are gone"""
+    gc.collect()
+    tracemalloc.start()
+    kept = decode()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return size
+
+
+def read_dicts(matches):
+    # The fields home() used to pull out of each upstream dict on every request
+    for match in matches:
+        (match.get('homeTeam', {}).get('name', 'Unknown'), match.get('awayTeam', {}).get('name', 'Unknown'),
+         match.get('score', {}).get('fullTime', {}).get('home'), match.get('score', {}).get('fullTime', {}).get('away'),
+         match.get('status', 'UNKNOWN'), match.get('competition', {}).get('name', 'Unknown'), match.get('utcDate', ''))
+
+
+def read_records(matches):
+    for match in matches:
+        (match.home_team.name, match.away_team.name, match.home_score, match.away_score,
+         match.status, match.competition.name, match.utc_date)
+
+
+for label, decode in (("raw dicts (old)", raw_dicts), ("Match records", records)):
+    print(f"{label:<28} kept in memory {kept_bytes(decode) / 1024 / 1024:8.2f} MiB")
+
+for label, decode in (("decode: json.loads (old)", raw_dicts), ("decode: json.loads + records", records)):
+    timings = []
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        decode()
+        timings.append(time.perf_counter() - started)
+    report(label, timings)
+
+for label, read, matches in (("read fields: dicts (old)", read_dicts, raw_dicts()),
+                             ("read fields: records", read_records, records())):
+    timings = []
+    for _ in range(ROUNDS * 10):
+        started = time.perf_counter()
+        read(matches)
+        timings.append(time.perf_counter() - started)
+    report(label, timings)
@@ -0,0 +1,134 @@
+"""SSE fan-out load test: thousands of /events/live clients on one gevent worker.
+
+    python bench/bench_sse.py [clients]
+
+Starts `FOOTBALL_ASYNC=1 app.py serve --workers 1 --poller` against the
+stub with matches in play, connects the clients (asyncio, 5000 by
+default; half of them subscribed to ?competitions=PL), then changes one
+score upstream. Reports how many clients got their snapshot and the
+update, the time from the poller's /matches call to each client reading
+the update, and the worker's memory per connected client.
+"""
+import asyncio
+import os
+import resource
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+import requests
+
+from stub_api import ROOT, StubAPI, app_environment, percentile
+
+CLIENTS = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+CONNECT_AT_ONCE = 200  # Connections being opened at the same time
+CONNECT_TIMEOUT = 30  # A client that gets no snapshot by then counts as not served
+UPDATE_TIMEOUT = 60  # The poller asks again every POLL_LIVE_INTERVAL while matches are on
+
+# Every client needs a socket here and one in the worker
+soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+if CLIENTS + 100 > hard:
+    CLIENTS = hard - 100
+    print(f"open file limit is {hard}, so only {CLIENTS} clients")
+
+stub = StubAPI(matches=40)
+stub.matches[0]["status"] = "IN_PLAY"  # Kicks off now, so the poller polls every POLL_LIVE_INTERVAL
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port):
+    server = subprocess.Popen([sys.executable, os.path.join(ROOT, "app.py"), "serve", "--workers", "1",
+                               "--poller", "--bind", f"127.0.0.1:{port}"],
+                              env=app_environment(stub, FOOTBALL_ASYNC="1"), start_new_session=True,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    for _ in range(300):
+        try:
+            requests.get(f"http://127.0.0.1:{port}/api/matches/live", timeout=1)
+            return server
+        except requests.RequestException:
+            time.sleep(0.1)
+    os.killpg(server.pid, signal.SIGKILL)
+    raise SystemExit("server did not start")
+
+
+def worker_rss(server):
+    """Resident memory of the gunicorn worker in MiB"""
+    with open(f"/proc/{server.pid}/task/{server.pid}/children") as children:
+        worker = children.read().split()[0]
+    with open(f"/proc/{worker}/status") as status:
+        line = next(line for line in status if line.startswith("VmRSS:"))
+    return int(line.split()[1]) / 1024
+
+
+class Client:
+    def __init__(self, number):
+        self.path = "/events/live?competitions=PL" if number % 2 else "/events/live"
+        self.updated_at = None
+
+    async def connect(self, port, slots):
+        async with slots:
+            self.reader, self.writer = await asyncio.open_connection("127.0.0.1", port)
+            self.writer.write(f"GET {self.path} HTTP/1.1\r\nHost: bench\r\n\r\n".encode())
+            await asyncio.wait_for(self.read_snapshot(), CONNECT_TIMEOUT)
+
+    async def read_snapshot(self):
+        await self.reader.readuntil(b"\r\n\r\n")  # Response headers
+        await self.read_event()  # event: snapshot
+
+    async def read_event(self):
+        return await self.reader.readuntil(b"\n\n")
+
+    async def wait_for_update(self):
+        while True:
+            event = await self.read_event()
+            if b"event: update" in event:
+                self.updated_at = time.time()
+                return
+
+
+async def main(port, server):
+    slots = asyncio.Semaphore(CONNECT_AT_ONCE)
+    clients = [Client(number) for number in range(CLIENTS)]
+    memory_before = worker_rss(server)
+    started = time.perf_counter()
+    results = await asyncio.gather(*(client.connect(port, slots) for client in clients), return_exceptions=True)
+    connected = [client for client, result in zip(clients, results) if result is None]
+    print(f"{len(connected)} of {CLIENTS} clients got their snapshot in {time.perf_counter() - started:.1f} s")
+    memory_after = worker_rss(server)
+    print(f"worker memory {memory_before:.0f} -> {memory_after:.0f} MiB "
+          f"({(memory_after - memory_before) * 1024 / max(len(connected), 1):.1f} KiB per client)")
+
+    # Change a score upstream; the next poll publishes it to everyone
+    changed_at = time.time()
+    stub.matches[0]["score"]["fullTime"]["home"] += 1
+    waiting = [asyncio.create_task(client.wait_for_update()) for client in connected]
+    while stub.called_at.get("matches", 0) <= changed_at:
+        await asyncio.sleep(0.001)
+    polled_at = stub.called_at["matches"]
+    await asyncio.wait(waiting, timeout=UPDATE_TIMEOUT)
+
+    delays = [client.updated_at - polled_at for client in connected if client.updated_at]
+    print(f"{len(delays)} of {len(connected)} clients got the update")
+    if delays:
+        print(f"poll to client: p50 {percentile(delays, 0.5) * 1000:.0f} ms   p99 {percentile(delays, 0.99) * 1000:.0f} ms"
+              f"   last {max(delays) * 1000:.0f} ms")
+    for client in clients:
+        if hasattr(client, "writer"):
+            client.writer.close()
+
+
+port = free_port()
+server = start_server(port)
+try:
+    asyncio.run(main(port, server))
+finally:
+    os.killpg(server.pid, signal.SIGKILL)  # Master and worker; SIGTERM would wait for the open streams
+    server.wait()
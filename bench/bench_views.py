@@ -0,0 +1,98 @@
+"""home()'s match processing per request: building the display dicts every time vs the prebuilt views.
+
+    python bench/bench_views.py [requests]
+
+For 10, 100 and 1000 matches (in both the live and the upcoming list),
+times the CPU one request spends turning matches into what index.html
+shows. The old path is home()'s loop from before the views, with the old
+status helper that rebuilt its dict on every call; the new path is
+process_live_matches / process_upcoming_matches on decoded records, in
+server time and in a ?tz= zone (whose views are worked out on the first
+request and kept).
+"""
+import sys
+import time
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from stub_api import StubAPI, load_app, make_matches
+
+REQUESTS = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+ZONE = ZoneInfo("Europe/Paris")
+
+football = load_app(StubAPI())
+
+
+def old_status_display(status):
+    status_map = {
+        'SCHEDULED': ' Scheduled',
+        'IN_PLAY': ' LIVE',
+        'PAUSED': ' Half Time',
+        'FINISHED': ' Finished',
+        'POSTPONED': ' Postponed',
+        'CANCELLED': ' Cancelled'
+    }
+    return status_map.get(status, status)
+
+
+def old_format_time(utc_date_str):
+    try:
+        return datetime.fromisoformat(utc_date_str.replace('Z', '+00:00')).strftime('%H:%M')
+    except:
+        return "TBD"
+
+
+def old_format_date(utc_date_str):
+    try:
+        return datetime.fromisoformat(utc_date_str.replace('Z', '+00:00')).strftime('%B %d, %Y')
+    except:
+        return "Date TBD"
+
+
+def old_processing(live_matches, upcoming_matches):
+    # home() before the views, on the raw upstream dicts
+    processed_matches = []
+    for match in live_matches:
+        processed_matches.append({
+            'homeTeam': match.get('homeTeam', {}).get('name', 'Unknown'),
+            'awayTeam': match.get('awayTeam', {}).get('name', 'Unknown'),
+            'homeScore': match.get('score', {}).get('fullTime', {}).get('home'),
+            'awayScore': match.get('score', {}).get('fullTime', {}).get('away'),
+            'status': old_status_display(match.get('status', 'UNKNOWN')),
+            'competition': match.get('competition', {}).get('name', 'Unknown'),
+            'time': old_format_time(match.get('utcDate', '')),
+            'is_live': match.get('status') == 'IN_PLAY'
+        })
+    processed_upcoming = []
+    for match in upcoming_matches:
+        processed_upcoming.append({
+            'homeTeam': match.get('homeTeam', {}).get('name', 'Unknown'),
+            'awayTeam': match.get('awayTeam', {}).get('name', 'Unknown'),
+            'competition': match.get('competition', {}).get('name', 'Unknown'),
+            'date': old_format_date(match.get('utcDate', '')),
+            'time': old_format_time(match.get('utcDate', ''))
+        })
+    return processed_matches, processed_upcoming
+
+
+def prebuilt(live_matches, upcoming_matches, zone=None):
+    return (football.process_live_matches(live_matches, zone),
+            football.process_upcoming_matches(upcoming_matches, zone))
+
+
+def cpu_per_request(run, *args):
+    run(*args)  # First request (builds the zone views)
+    started = time.process_time()
+    for _ in range(REQUESTS):
+        run(*args)
+    return (time.process_time() - started) / REQUESTS * 1000
+
+
+print(f"{'matches':>8} {'old home()':>14} {'prebuilt':>14} {'prebuilt, tz':>14}   (ms CPU per request)")
+for count in (10, 100, 1000):
+    raw = make_matches(count)
+    records = football.decode_items("matches", raw)
+    assert old_processing(raw, raw) == prebuilt(records, records)
+    print(f"{count:>8} {cpu_per_request(old_processing, raw, raw):>14.3f} "
+          f"{cpu_per_request(prebuilt, records, records):>14.3f} "
+          f"{cpu_per_request(prebuilt, records, records, ZONE):>14.3f}")
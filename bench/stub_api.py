@@ -0,0 +1,149 @@
+"""A local football-data.org stand-in for the benchmarks (no API key or network needed).
+
+Start it, then call load_app(stub) to import app.py pointed at it:
+
+    stub = StubAPI(latency=0.2)
+    football = load_app(stub)
+"""
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COUNTRIES = ["England", "Spain", "Germany", "Italy", "France", "Portugal", "Netherlands", "Brazil"]
+STATUSES = ["SCHEDULED", "TIMED", "IN_PLAY", "PAUSED", "FINISHED"]
+
+
+def make_competitions(count):
+    """count competitions spread over a few countries"""
+    return [{"id": number, "name": f"League {number:05d} {COUNTRIES[number % len(COUNTRIES)]}",
+             "code": f"L{number}", "type": "LEAGUE", "emblem": f"https://crests.example/{number}.png",
+             "area": {"id": number % len(COUNTRIES), "name": COUNTRIES[number % len(COUNTRIES)],
+                      "code": COUNTRIES[number % len(COUNTRIES)][:3].upper(), "flag": None},
+             "plan": "TIER_ONE", "currentSeason": {"id": number, "startDate": "2026-08-01",
+                                                    "endDate": "2027-05-30", "currentMatchday": 8}}
+            for number in range(count)]
+
+
+def make_matches(count, start=None):
+    """count matches in the upstream shape (with the fields the app drops), kicking off from start"""
+    start = time.time() if start is None else start
+    matches = []
+    for number in range(count):
+        kickoff = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(start + number * 600))
+        team = {"id": number, "name": f"Team {number}", "shortName": f"T{number}", "tla": "TTT",
+                "crest": f"https://crests.example/team/{number}.png"}
+        matches.append({
+            "area": {"id": 2072, "name": "England", "code": "ENG", "flag": "https://crests.example/770.svg"},
+            "competition": {"id": 2021, "name": "Premier League", "code": "PL", "type": "LEAGUE",
+                            "emblem": "https://crests.example/PL.png"},
+            "season": {"id": 2287, "startDate": "2026-08-15", "endDate": "2027-05-24", "currentMatchday": 8},
+            "id": number, "utcDate": kickoff, "status": STATUSES[number % len(STATUSES)], "matchday": 8,
+            "stage": "REGULAR_SEASON", "group": None, "lastUpdated": kickoff,
+            "homeTeam": team, "awayTeam": dict(team, name=f"Team {number + 1}"),
+            "score": {"winner": None, "duration": "REGULAR", "fullTime": {"home": number % 4, "away": number % 3},
+                      "halfTime": {"home": number % 2, "away": 0}},
+            "odds": {"msg": "Activate Odds-Package in User-Panel to retrieve odds."},
+            "referees": [{"id": number, "name": "A Referee", "type": "REFEREE", "nationality": "England"}],
+        })
+    return matches
+
+
+class StubAPI:
+    """HTTP/1.1 keep-alive server answering /v4/competitions and /v4/matches.
+
+    latency is seconds added to every call (a (low, high) pair picks a
+    random one per call). calls and connections count what the app did;
+    called_at has the time of the last call to each endpoint.
+    """
+
+    def __init__(self, latency=0, competitions=50, matches=40):
+        self.latency = latency
+        self.competitions = make_competitions(competitions)
+        self.matches = make_matches(matches)
+        self.calls = 0
+        self.connections = 0
+        self.called_at = {}
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self.make_handler())
+        self.server.daemon_threads = True
+        self.server.request_queue_size = 1024
+        self.server.handle_error = lambda request, address: None  # Clients hanging up mid-response are expected
+        self.base = f"http://127.0.0.1:{self.server.server_port}/v4"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def wait(self):
+        if isinstance(self.latency, tuple):
+            time.sleep(random.uniform(*self.latency))
+        elif self.latency:
+            time.sleep(self.latency)
+
+    def make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True  # Headers and body go out in two writes; don't wait on delayed ACKs
+
+            def setup(self):
+                super().setup()
+                with stub.lock:
+                    stub.connections += 1
+
+            def do_GET(self):
+                endpoint = urlparse(self.path).path.rsplit("/", 1)[-1]
+                with stub.lock:
+                    stub.calls += 1
+                    stub.called_at[endpoint] = time.time()
+                stub.wait()
+                data = json.dumps({endpoint: stub.matches if endpoint == "matches" else stub.competitions}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.send_header("X-Requests-Available-Minute", "100000")
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def app_environment(stub, **extra):
+    """Environment variables that point app.py at the stub"""
+    return dict(os.environ, FOOTBALL_API_BASE=stub.base, FOOTBALL_API_KEY="bench", FOOTBALL_SNAPSHOT_DIR="",
+                FOOTBALL_API_RATE_LIMIT="100000", **extra)
+
+
+def load_app(stub):
+    """Import app.py configured to call the stub"""
+    os.environ.update(app_environment(stub))
+    sys.path.insert(0, ROOT)
+    import app
+    return app
+
+
+def reset_caches(football):
+    """Forget every cached API response and page, so the next call goes upstream"""
+    football.api_cache = football.MemoryCacheBackend()
+    football.page_cache.clear()
+    football.page_cache_state["bytes"] = 0
+    football.match_store.update(source=None, store=None)
+    football.competition_index.update(source=None, index=None)
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def report(label, seconds):
+    """Print p50/p99/mean of a list of timings in milliseconds"""
+    print(f"{label:<28} p50 {percentile(seconds, 0.5) * 1000:8.2f} ms   "
+          f"p99 {percentile(seconds, 0.99) * 1000:8.2f} ms   mean {sum(seconds) / len(seconds) * 1000:8.2f} ms")
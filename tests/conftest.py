@@ -0,0 +1,164 @@
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class StubAPI:
+    """A local stand-in for football-data.org that records every call.
+
+    Tests set `handler(endpoint, params) -> (status, body, headers)` to
+    shape the answers and `delay` to make every call slow.
+    """
+
+    def __init__(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self.make_handler())
+        self.server.daemon_threads = True
+        self.base = f"http://127.0.0.1:{self.server.server_port}/v4"
+        self.lock = threading.Lock()
+        self.reset()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def reset(self):
+        self.calls = []
+        self.delay = 0
+        self.competitions = [{"name": "Premier League", "code": "PL", "area": {"name": "England"}, "plan": "TIER_ONE"}]
+        self.matches = []
+        self.handler = self.default_handler
+
+    def default_handler(self, endpoint, params):
+        return 200, {endpoint: self.matches if endpoint == "matches" else self.competitions}, {}
+
+    def calls_to(self, endpoint):
+        with self.lock:
+            return [params for called, params in self.calls if called == endpoint]
+
+    def make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                endpoint = url.path.rsplit("/", 1)[-1]
+                params = {key: values[0] for key, values in parse_qs(url.query).items()}
+                with stub.lock:
+                    stub.calls.append((endpoint, params))
+                if stub.delay:
+                    time.sleep(stub.delay)
+                status, body, headers = stub.handler(endpoint, params)
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+class FakeRedis:
+    """The few redis.Redis calls RedisCacheBackend makes, kept in a dict (latency = seconds per call)"""
+
+    def __init__(self):
+        self.values = {}
+        self.latency = 0
+
+    def wait(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def get(self, key):
+        self.wait()
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None, nx=False):
+        self.wait()
+        if ex is not None and ex <= 0:
+            raise ValueError("invalid expire time in 'set' command")  # What Redis answers
+        if nx and key in self.values:
+            return None
+        if not isinstance(value, bytes):
+            value = value.encode() if isinstance(value, str) else str(value).encode()
+        self.values[key] = value
+        return True
+
+    def delete(self, *keys):
+        self.wait()
+        for key in keys:
+            self.values.pop(key, None)
+
+    def scan_iter(self, match="*"):
+        prefix = match.rstrip("*")
+        return [key.encode() for key in list(self.values) if key.startswith(prefix)]
+
+
+# The app reads its settings when it is imported, so the stub has to exist first
+stub_api = StubAPI()
+os.environ["FOOTBALL_API_BASE"] = stub_api.base
+os.environ["FOOTBALL_API_KEY"] = "test-key"
+os.environ["FOOTBALL_SNAPSHOT_DIR"] = ""
+os.environ.pop("FOOTBALL_CACHE_URL", None)
+os.environ.pop("FOOTBALL_POLLER", None)
+
+import app as football  # noqa: E402
+
+
+def api_match(match_id, kickoff, status="TIMED", code="PL", home=0, away=0):
+    """A /v4/matches item kicking off at Unix time kickoff"""
+    utc_date = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(kickoff))
+    return {"id": match_id, "utcDate": utc_date, "status": status,
+            "competition": {"name": code, "code": code},
+            "homeTeam": {"name": f"Home {match_id}"}, "awayTeam": {"name": f"Away {match_id}"},
+            "score": {"fullTime": {"home": home, "away": away}}}
+
+
+@pytest.fixture
+def stub():
+    return stub_api
+
+
+@pytest.fixture(autouse=True)
+def fresh_app():
+    """Give every test an empty cache, a closed breaker and a full rate budget"""
+    stub_api.reset()
+    football.api_cache = football.MemoryCacheBackend()
+    football.in_flight.clear()
+    football.cache_stats.update(hits=0, misses=0, stale=0)
+    football.circuit.update(failures=0, opened_at=None, probing=False, cooldown=football.CIRCUIT_COOLDOWN)
+    football.rate_budget.update(tokens=float(football.RATE_LIMIT_PER_MINUTE), updated=time.time(),
+                                reset_at=None, denied={})
+    football.page_cache.clear()
+    football.page_cache_state.update(bytes=0, hits=0, misses=0)
+    football.match_store.update(source=None, store=None)
+    football.match_window.update(key=None)
+    football.live_subscribers.clear()
+    football.live_state.clear()
+    football.poller_state.update(schedule=None, last_poll=None, next_delay=None)
+    yield football
+
+
+@pytest.fixture
+def redis_cache():
+    """A RedisCacheBackend talking to a FakeRedis, installed as the app's cache"""
+    backend = football.RedisCacheBackend.__new__(football.RedisCacheBackend)
+    backend.client = FakeRedis()
+    backend.decoded = {}
+    football.api_cache = backend
+    return backend
+
+
+@pytest.fixture
+def client():
+    return football.app.test_client()
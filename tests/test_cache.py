@@ -0,0 +1,108 @@
+import threading
+import time
+
+import app as football
+
+
+def expire(key):
+    """Make a cached entry look like its TTL ran out"""
+    entry = football.api_cache.get(key)
+    entry["expires"] = time.time() - 1
+
+
+def run_together(count, target):
+    """Call target from count threads released at the same moment, returning their results"""
+    barrier = threading.Barrier(count)
+    results = [None] * count
+
+    def worker(position):
+        barrier.wait()
+        results[position] = target()
+
+    threads = [threading.Thread(target=worker, args=(position,)) for position in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_one_upstream_call_per_expiry(stub):
+    stub.delay = 0.3  # Keep the call in flight while every thread arrives
+    key = football.cache_key("competitions")
+
+    for expiry in range(3):
+        results = run_together(50, lambda: football.cached_api_get("competitions"))
+        assert len(stub.calls_to("competitions")) == expiry + 1
+        assert all(result and result[0].code == "PL" for result in results)
+        expire(key)
+
+
+def test_waiting_callers_get_the_stale_value(stub):
+    football.cached_api_get("competitions")
+    expire(football.cache_key("competitions"))
+    stub.delay = 0.3
+    stub.competitions = [{"name": "Serie A", "code": "SA", "area": {"name": "Italy"}}]
+
+    results = run_together(20, lambda: football.cached_api_get("competitions"))
+
+    assert len(stub.calls_to("competitions")) == 2
+    # The leader waits for the new list, everyone else gets the old one right away
+    codes = sorted(result[0].code for result in results)
+    assert codes.count("SA") == 1 and codes.count("PL") == 19
+
+
+def test_stale_while_revalidate_refreshes_once_in_background(stub):
+    football.get_competitions_data()
+    expire(football.cache_key("competitions"))
+    stub.delay = 0.2
+
+    results = run_together(30, football.get_competitions_data)
+
+    assert all(using_fallback is False for _, using_fallback in results)
+    football.refresh_pool.submit(lambda: None).result()  # Let the refresh finish
+    time.sleep(0.3)
+    assert len(stub.calls_to("competitions")) == 2
+    assert football.cache_stats["stale"] == 30
+
+
+def test_failed_fetch_falls_back_to_last_good_data(stub):
+    football.cached_api_get("competitions")
+    expire(football.cache_key("competitions"))
+    stub.handler = lambda endpoint, params: (500, {}, {})
+
+    competitions = football.cached_api_get("competitions")
+
+    assert competitions[0].code == "PL"
+
+
+def test_slow_cache_backend_does_not_block_other_threads(stub, redis_cache):
+    football.cached_api_get("competitions")
+    redis_cache.client.latency = 0.3
+    reader = threading.Thread(target=football.get_cached, args=(football.cache_key("competitions"),))
+    reader.start()
+    time.sleep(0.05)  # The reader is now waiting on "Redis"
+
+    started = time.time()
+    with football.cache_lock:
+        waited = time.time() - started
+    reader.join()
+
+    assert waited < 0.1
+
+
+def test_redis_backend_shares_single_flight(stub, redis_cache):
+    stub.delay = 0.2
+
+    results = run_together(20, lambda: football.cached_api_get("competitions"))
+
+    assert len(stub.calls_to("competitions")) == 1
+    assert all(result[0].code == "PL" for result in results)
+
+
+def test_redis_backend_reads_its_own_write_without_decoding_again(stub, redis_cache):
+    competitions = football.cached_api_get("competitions")
+    version = football.data_version["number"]
+
+    assert football.cached_api_get("competitions") is competitions
+    assert football.data_version["number"] == version  # Pages built after the refresh stay valid
@@ -0,0 +1,115 @@
+import json
+import queue
+import threading
+import time
+
+import app as football
+from conftest import api_match
+
+
+class FakeSocket:
+    """Just enough of a flask-sock connection to drive live_socket"""
+
+    def __init__(self):
+        self.incoming = queue.Queue()
+        self.sent = []
+
+    def receive(self):
+        message = self.incoming.get()
+        if message is None:
+            raise ConnectionError("closed")
+        return message
+
+    def send(self, data):
+        self.sent.append(json.loads(data))
+
+
+def wait_for(condition, timeout=2):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def open_socket(monkeypatch, path="/ws/live?competitions=PL"):
+    monkeypatch.setattr(football, "start_poller", lambda: None)
+    ws = FakeSocket()
+
+    def run():
+        with football.app.test_request_context(path):
+            football.live_socket(ws)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    wait_for(lambda: football.live_subscribers)
+    return ws, thread, next(iter(football.live_subscribers))
+
+
+def test_dropped_websocket_client_is_closed(monkeypatch):
+    ws, thread, subscriber = open_socket(monkeypatch)
+    for _ in range(football.SSE_QUEUE_SIZE - subscriber.qsize()):
+        subscriber.put_nowait(b"[]")
+
+    # The queue is full, so this update drops the client
+    football.publish_live_changes([football.Match.from_api(api_match(1, time.time(), "IN_PLAY"))])
+
+    thread.join(timeout=2)
+    assert not thread.is_alive()
+    ws.incoming.put(None)
+
+
+def test_subscribe_does_not_bring_back_a_dropped_client(monkeypatch):
+    ws, thread, subscriber = open_socket(monkeypatch)
+    with football.live_lock:
+        football.live_subscribers.pop(subscriber)
+
+    ws.incoming.put(json.dumps({"subscribe": ["CL"]}))
+    time.sleep(0.1)
+    assert subscriber not in football.live_subscribers
+
+    subscriber.put(b"[]")  # Wake the sending loop
+    thread.join(timeout=2)
+    assert not thread.is_alive()
+
+
+def test_changes_after_the_tenth_match_of_the_day_are_published(stub):
+    start = football.start_of_day(0) + 3600
+    stub.matches = [api_match(number, start + number * 60) for number in range(12)]
+    stub.matches.append(api_match(99, start + 3600, code="CL"))
+    football.publish_live_changes(football.get_live_matches(limit=None)[0])
+    subscriber = queue.Queue()
+    football.live_subscribers[subscriber] = frozenset({"CL"})
+
+    stub.matches[-1] = api_match(99, start + 3600, "IN_PLAY", code="CL")
+    live_matches, _ = football.get_live_matches(force=True, limit=None)
+    changed = football.publish_live_changes(live_matches)
+
+    assert [match.id for match in changed] == [99]
+    assert [update["id"] for update in json.loads(subscriber.get_nowait())] == ["99"]
+    assert len(football.get_live_matches()[0]) == 10  # The page list is still capped
+
+
+def test_sse_client_subscribes_before_taking_the_snapshot(monkeypatch, stub):
+    monkeypatch.setattr(football, "start_poller", lambda: None)
+    get_live_matches = football.get_live_matches
+    subscribed = []
+
+    def snapshot(**kwargs):
+        # A change the poller publishes from here on must reach the new client
+        subscribed.append(len(football.live_subscribers))
+        return get_live_matches(**kwargs)
+
+    monkeypatch.setattr(football, "get_live_matches", snapshot)
+    with football.app.test_request_context("/events/live"):
+        football.live_events()
+
+    assert subscribed == [1]
+
+
+def test_matches_no_longer_today_are_forgotten():
+    today = [football.Match.from_api(api_match(number, time.time(), "IN_PLAY")) for number in (1, 2)]
+    football.publish_live_changes(today)
+
+    football.publish_live_changes(today[1:])
+
+    assert list(football.live_state) == ["2"]
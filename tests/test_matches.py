@@ -0,0 +1,33 @@
+import pytest
+
+import app as football
+
+
+@pytest.fixture(params=["memory", "redis"])
+def cache(request):
+    if request.param == "redis":
+        return request.getfixturevalue("redis_cache")
+    return football.api_cache
+
+
+def test_match_windows_from_earlier_days_are_dropped(stub, cache, monkeypatch):
+    cache.set("matches?dateFrom=2020-01-01&dateTo=2020-01-10", {"data": [], "timestamp": 0, "expires": 0})
+    football.get_competitions_data()
+    football.get_match_window()
+
+    monkeypatch.setattr(football, "match_window_params",
+                        lambda: {"dateFrom": "2099-01-01", "dateTo": "2099-01-10"})
+    football.get_match_window()
+
+    assert sorted(cache.keys()) == ["competitions?", "matches?dateFrom=2099-01-01&dateTo=2099-01-10"]
+
+
+def test_window_is_kept_when_the_new_day_fetch_fails(stub, monkeypatch):
+    football.get_match_window()
+    today_key = football.cache_key("matches", football.match_window_params())
+    stub.handler = lambda endpoint, params: (500, {}, {})
+
+    monkeypatch.setattr(football, "match_window_params",
+                        lambda: {"dateFrom": "2099-01-01", "dateTo": "2099-01-10"})
+    assert football.get_match_window() is None
+    assert football.api_cache.get(today_key) is not None
@@ -0,0 +1,85 @@
+import gzip
+
+import app as football
+
+
+def test_repeat_request_is_served_from_the_page_cache(client, stub):
+    football.get_competitions_data()
+    first = client.get("/api/competitions")
+    second = client.get("/api/competitions")
+
+    assert first.data == second.data
+    assert football.page_cache_state["hits"] == 1
+    assert len(stub.calls_to("competitions")) == 1
+
+
+def test_new_api_data_invalidates_cached_pages(client, stub):
+    client.get("/api/competitions")
+    stub.competitions = [{"name": "Serie A", "code": "SA", "area": {"name": "Italy"}}]
+
+    football.get_competitions_data(force=True)
+    response = client.get("/api/competitions")
+
+    assert [comp["code"] for comp in response.json["competitions"]] == ["SA"]
+
+
+def test_query_args_get_their_own_page(client):
+    client.get("/api/competitions?search=premier")
+    response = client.get("/api/competitions?search=serie")
+
+    assert response.json["competitions"] == []
+    assert football.page_cache_state["hits"] == 0
+
+
+def test_conditional_request_gets_304(client):
+    etag = client.get("/api/competitions").headers["ETag"]
+
+    response = client.get("/api/competitions", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304 and response.data == b""
+
+
+def test_compressed_body_is_stored_with_the_page(client, stub):
+    stub.competitions = [{"name": f"League {number}", "code": f"L{number}", "area": {"name": "Testland"}}
+                         for number in range(50)]
+
+    response = client.get("/api/competitions", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(response.data) == client.get("/api/competitions").data
+
+
+def test_gzip_bytes_are_the_same_in_every_worker():
+    # The ETag is per encoding, so the bytes must not depend on when or where the page was built
+    first = football.make_page_entry("x" * 1000, 1, 0, 30)["bodies"]["gzip"]
+    second = football.make_page_entry("x" * 1000, 1, 0, 30)["bodies"]["gzip"]
+
+    assert first == second and first[4:8] == bytes(4)  # Header mtime is zero
+
+
+def test_only_pages_showing_match_times_vary_on_cookie(client):
+    static = client.get("/api/team/liverpool")
+    competitions = client.get("/api/competitions")
+    live = client.get("/api/matches/live")
+
+    assert static.status_code == 200 and static.headers["Cache-Control"] == "public, max-age=86400"
+    assert "Cookie" not in static.headers["Vary"]
+    assert "Cookie" not in competitions.headers["Vary"]
+    assert "Cookie" in live.headers["Vary"]
+
+
+def test_timezone_gets_its_own_page(client):
+    client.get("/api/matches/live?tz=Asia/Tokyo")
+    client.get("/api/matches/live", headers={"Cookie": "tz=America/Los_Angeles"})
+
+    assert football.page_cache_state["hits"] == 0
+    assert len(football.page_cache) == 2
+
+
+def test_pages_without_match_times_are_shared_by_every_timezone(client):
+    football.get_competitions_data()
+    client.get("/api/competitions?tz=Asia/Tokyo")
+    client.get("/api/competitions", headers={"Cookie": "tz=America/Los_Angeles"})
+
+    assert football.page_cache_state["hits"] == 1
+    assert len(football.page_cache) == 1
@@ -0,0 +1,140 @@
+import threading
+import time
+
+import pytest
+
+import app as football
+from conftest import api_match
+
+KICKOFF = 1_800_000_000  # A fixed kickoff time for the simulated clock
+
+
+def schedule_at(now, *matches):
+    store = football.build_match_store([football.Match.from_api(match) for match in matches])
+    return football.build_poll_schedule(store, now)
+
+
+def test_match_is_polled_from_shortly_before_kickoff():
+    match = api_match(1, KICKOFF)
+
+    before = schedule_at(KICKOFF - football.KICKOFF_LEAD - 60, match)
+    assert before["active"] == [] and before["delay"] == 60
+
+    during = schedule_at(KICKOFF - football.KICKOFF_LEAD, match)
+    assert during["active"] == ["1"] and during["delay"] == football.POLL_LIVE_INTERVAL
+
+
+@pytest.mark.parametrize("lead_in, delay", [(0.4, 1), (0.001, 1), (59.6, 60)])
+def test_poller_never_sleeps_less_than_a_second_before_the_lead_time(lead_in, delay):
+    match = api_match(1, KICKOFF)
+
+    assert schedule_at(KICKOFF - football.KICKOFF_LEAD - lead_in, match)["delay"] == delay
+
+
+@pytest.mark.parametrize("status", football.ENDED_STATUSES)
+def test_ended_matches_are_not_polled(status):
+    schedule = schedule_at(KICKOFF + 600, api_match(1, KICKOFF, status))
+
+    assert schedule["active"] == [] and schedule["delay"] == football.POLL_IDLE_INTERVAL
+
+
+def test_match_stuck_in_play_stops_being_polled():
+    match = api_match(1, KICKOFF, "IN_PLAY")
+
+    assert schedule_at(KICKOFF + football.MATCH_MAX_DURATION - 1, match)["active"] == ["1"]
+    assert schedule_at(KICKOFF + football.MATCH_MAX_DURATION, match)["active"] == []
+
+
+def test_idle_poller_sleeps_until_the_next_kickoff_lead_time():
+    soon = api_match(1, KICKOFF + football.KICKOFF_LEAD + 100)
+    later = api_match(2, KICKOFF + 6 * 3600)
+    unknown = dict(api_match(3, KICKOFF), utcDate="")
+
+    assert schedule_at(KICKOFF, soon, later, unknown)["delay"] == 100
+    assert schedule_at(KICKOFF, later)["delay"] == football.POLL_IDLE_INTERVAL
+    assert schedule_at(KICKOFF, unknown)["next_kickoff"] is None
+
+
+def test_polling_is_narrowed_to_competitions_in_play():
+    schedule = schedule_at(KICKOFF, api_match(1, KICKOFF, "IN_PLAY", code="PL"),
+                           api_match(2, KICKOFF - 3600, "PAUSED", code="CL"),
+                           api_match(3, KICKOFF + 3600, code="SA"))
+
+    assert schedule["competitions"] == ["CL", "PL"]
+    # A match without a competition code means the whole window is polled
+    no_code = dict(api_match(4, KICKOFF, "IN_PLAY"), competition={"name": "Friendly"})
+    assert schedule_at(KICKOFF, no_code)["competitions"] is None
+
+
+def test_narrowed_poll_is_merged_into_the_window(stub):
+    now = time.time()
+    stub.matches = [api_match(1, now - 600, "IN_PLAY", code="PL"), api_match(2, now + 7200, code="SA")]
+    store = football.get_match_store(football.get_match_window())
+    schedule = football.build_poll_schedule(store, now)
+    stub.matches = [api_match(1, now - 600, "IN_PLAY", code="PL", home=1), api_match(5, now - 60, "IN_PLAY")]
+
+    merged = football.refresh_active_matches(schedule)
+
+    assert stub.calls_to("matches")[-1]["competitions"] == "PL"
+    assert [(match.id, match.home_score) for match in merged] == [(1, 1), (2, 0), (5, 0)]
+    assert football.get_match_window() is merged
+
+
+class SimulatedStop(threading.Event):
+    """Stops the poller after rounds waits, moving the simulated clock instead of sleeping"""
+
+    def __init__(self, rounds):
+        super().__init__()
+        self.now = time.time()
+        self.rounds = rounds
+
+    def clock(self):
+        return self.now
+
+    def wait(self, timeout=None):
+        if timeout:
+            self.now += timeout
+            self.rounds -= 1
+            if self.rounds <= 0:
+                self.set()
+        return self.is_set()
+
+
+def test_whole_window_is_refetched_while_matches_are_on(stub, monkeypatch):
+    monkeypatch.setattr(football, "RATE_LIMIT_PER_MINUTE", 10_000)
+    football.rate_budget["tokens"] = 10_000.0
+    now = time.time()
+    stub.matches = [api_match(1, now - 600, "IN_PLAY")]
+    rounds = 2 * football.POLL_IDLE_INTERVAL // football.POLL_LIVE_INTERVAL
+    stop = SimulatedStop(rounds)
+
+    football.poll_upstream(stop, clock=stop.clock)
+
+    full = [params for params in stub.calls_to("matches") if "competitions" not in params]
+    narrowed = [params for params in stub.calls_to("matches") if "competitions" in params]
+    assert len(full) == 2  # At the start and once POLL_IDLE_INTERVAL later
+    assert len(narrowed) == rounds - 2
+
+
+def test_schedule_endpoint(client, stub):
+    now = time.time()
+    stub.matches = [api_match(1, now + 3600)]
+    football.get_match_window()
+
+    response = client.get(f"/debug/schedule?at={now + 3600}")
+
+    assert response.json["schedule"]["active"] == ["1"]
+    for bad in ("soon", "nan", "inf"):
+        assert client.get(f"/debug/schedule?at={bad}").status_code == 400
+
+
+def test_polled_window_stays_fresh_while_the_poller_sleeps(stub):
+    now = time.time()
+    stub.matches = [api_match(1, now + 6 * 3600)]  # Nothing until this evening
+    stop = SimulatedStop(rounds=1)
+
+    football.poll_upstream(stop, clock=stop.clock)
+
+    entry = football.api_cache.get(football.cache_key("matches", football.match_window_params()))
+    assert football.poller_state["next_delay"] == football.POLL_IDLE_INTERVAL
+    assert entry["expires"] - entry["timestamp"] > football.POLL_IDLE_INTERVAL  # Page requests never wait on the API
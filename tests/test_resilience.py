@@ -0,0 +1,93 @@
+import time
+
+import pytest
+
+import app as football
+
+
+def failing(endpoint, params):
+    return 500, {"message": "down"}, {}
+
+
+def test_breaker_opens_after_repeated_failures(stub):
+    stub.handler = failing
+    for _ in range(football.CIRCUIT_FAILURE_THRESHOLD):
+        football.api_get("competitions")
+
+    with pytest.raises(football.CircuitOpenError):
+        football.api_get("competitions")
+    assert len(stub.calls_to("competitions")) == football.CIRCUIT_FAILURE_THRESHOLD
+
+
+def test_breaker_lets_one_probe_through_after_the_cooldown(stub):
+    stub.handler = failing
+    for _ in range(football.CIRCUIT_FAILURE_THRESHOLD):
+        football.api_get("competitions")
+    football.circuit["opened_at"] = time.time() - football.CIRCUIT_COOLDOWN - 1
+
+    assert football.circuit_allows_call()
+    assert not football.circuit_allows_call()  # Only the one probe
+
+    football.circuit["probing"] = False
+    stub.handler = stub.default_handler
+    assert football.api_get("competitions").status_code == 200
+    assert football.circuit["opened_at"] is None and football.circuit["failures"] == 0
+
+
+def test_failed_probe_doubles_the_cooldown(stub):
+    stub.handler = failing
+    for _ in range(football.CIRCUIT_FAILURE_THRESHOLD):
+        football.api_get("competitions")
+    football.circuit["opened_at"] = time.time() - football.CIRCUIT_COOLDOWN - 1
+
+    football.api_get("competitions")
+
+    assert football.circuit["cooldown"] == football.CIRCUIT_COOLDOWN * 2
+    with pytest.raises(football.CircuitOpenError):
+        football.api_get("competitions")
+
+
+def test_retry_after_stretches_the_cooldown(stub):
+    stub.handler = lambda endpoint, params: (503, {}, {"Retry-After": "120"})
+    for _ in range(football.CIRCUIT_FAILURE_THRESHOLD):
+        football.api_get("competitions")
+
+    assert football.circuit["cooldown"] == 120
+
+
+def test_open_breaker_serves_sample_data_without_calling(stub):
+    stub.handler = failing
+    for _ in range(football.CIRCUIT_FAILURE_THRESHOLD):
+        football.api_get("competitions")
+
+    competitions, using_fallback = football.get_competitions_data()
+
+    assert using_fallback and competitions is football.FALLBACK_COMPETITIONS
+    assert len(stub.calls_to("competitions")) == football.CIRCUIT_FAILURE_THRESHOLD
+
+
+def test_last_token_is_kept_for_live_fetches():
+    football.rate_budget["tokens"] = 1.0
+
+    assert not football.take_api_token("competitions")
+    assert football.take_api_token("live")
+    assert not football.take_api_token("live")
+    assert football.rate_budget["denied"] == {"competitions": 1, "live": 1}
+
+
+def test_bucket_refills_with_time():
+    football.rate_budget.update(tokens=0.0, updated=time.time() - 60)
+
+    assert football.seconds_until_api_token("live") == 0
+    assert football.take_api_token("live")
+
+
+def test_quota_headers_drive_the_bucket(stub):
+    stub.handler = lambda endpoint, params: (200, {"competitions": []},
+                                             {"X-Requests-Available-Minute": "0", "X-RequestCounter-Reset": "30"})
+    football.api_get("competitions")
+
+    with pytest.raises(football.RateLimitedError):
+        football.api_get("competitions")
+    assert 29 <= football.seconds_until_api_token("live") <= 30
+    assert len(stub.calls_to("competitions")) == 1
@@ -0,0 +1,40 @@
+import json
+import queue
+import threading
+from concurrent.futures import Future
+
+import app as football
+from conftest import api_match
+
+
+def test_forked_worker_gets_fresh_locks_and_no_poller():
+    held = football.cache_lock
+    held.acquire()  # As if another thread held it at the moment of the fork
+    football.in_flight["competitions?"] = Future()
+    football.poller_state["thread"] = threading.Thread(target=lambda: None)
+    try:
+        football.reset_after_fork()
+
+        assert football.cache_lock is not held and not football.cache_lock.locked()
+        assert football.in_flight == {}
+        assert football.poller_state["thread"] is None
+    finally:
+        held.release()
+
+
+def test_follower_publishes_from_the_cache_without_calling_the_api(stub):
+    key = football.cache_key("matches", football.match_window_params())
+    match = football.Match.from_api(api_match(1, football.start_of_day(0) + 60, "IN_PLAY"))
+    football.api_cache.set(key, {"data": [match], "timestamp": 0, "expires": 0})  # Long expired
+    subscriber = queue.Queue()
+    football.live_subscribers[subscriber] = None
+    football.poller_state["role"] = "follower"
+    try:
+        football.start_poller()
+        update = json.loads(subscriber.get(timeout=2))
+        football.stop_poller(timeout=2)
+    finally:
+        football.poller_state["role"] = "leader"
+
+    assert [item["id"] for item in update] == ["1"]
+    assert stub.calls == []
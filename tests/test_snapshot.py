@@ -0,0 +1,55 @@
+import os
+import time
+
+import pytest
+
+import app as football
+
+
+@pytest.fixture
+def snapshot_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(football, "SNAPSHOT_DIR", str(tmp_path))
+    monkeypatch.setattr(football, "SNAPSHOT_DELAY", 0.1)
+    football.snapshot_state.update(pending={}, timer=None)
+    yield tmp_path
+    timer = football.snapshot_state["timer"]
+    if timer:
+        timer.cancel()
+    football.snapshot_state.update(pending={}, timer=None)
+
+
+def test_storing_data_writes_the_snapshot_later(stub, snapshot_dir):
+    football.cached_api_get("competitions")
+
+    assert os.listdir(snapshot_dir) == []  # Not on the thread that fetched
+    time.sleep(0.3)
+    assert os.listdir(snapshot_dir) == [os.path.basename(football.snapshot_path("competitions?"))]
+
+
+def test_only_changed_entries_are_written(snapshot_dir):
+    for number in range(5):
+        football.set_cached(f"competitions?page={number}", football.FALLBACK_COMPETITIONS, 60)
+        football.set_cached(f"competitions?page={number}", football.FALLBACK_COMPETITIONS, 60)
+    assert football.save_snapshot() == 5  # One write per key, however often it changed
+
+    football.set_cached("competitions?page=3", football.FALLBACK_COMPETITIONS, 60)
+    assert football.save_snapshot() == 1
+    assert football.save_snapshot() == 0
+
+
+def test_snapshot_refills_an_empty_cache(snapshot_dir):
+    football.set_cached("competitions?", football.FALLBACK_COMPETITIONS, 60)
+    football.save_snapshot()
+    football.api_cache = football.MemoryCacheBackend()
+
+    assert football.load_snapshot() == 1
+    assert football.api_cache.get("competitions?")["data"] == football.FALLBACK_COMPETITIONS
+
+
+def test_days_old_snapshot_loads_into_redis(snapshot_dir, redis_cache):
+    football.set_cached("competitions?", football.FALLBACK_COMPETITIONS, 60)
+    football.snapshot_state["pending"]["competitions?"]["expires"] = time.time() - 3 * 86400
+    football.save_snapshot()
+    redis_cache.client.values.clear()
+
+    assert football.load_snapshot() == 1